@@ -0,0 +1,152 @@
+"""
+Проверка и бенчмарк быстрого кодирования calldata (utils/calldata.py)
+
+Для случайных аргументов сравнивает результат побайтно с Contract.encode_abi
+из web3, затем замеряет скорость обоих вариантов.
+
+Запуск из корня проекта:
+    python benchmarks/calldata.py [--cases 2000] [--number 5000]
+
+Код возврата 1 при любом расхождении с web3.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eth_utils import to_checksum_address
+from web3 import Web3
+
+from src.modulse.SwapTasks.constants import BEAN_ABI, BEAN_CONTRACT, IZUMI_ABI, IZUMI_CONTRACT
+from utils.constants import ERC20_ABI
+from utils import calldata
+
+web3 = Web3()
+bean = web3.eth.contract(address=BEAN_CONTRACT, abi=BEAN_ABI)
+izumi = web3.eth.contract(address=IZUMI_CONTRACT, abi=IZUMI_ABI)
+erc20 = web3.eth.contract(address=BEAN_CONTRACT, abi=ERC20_ABI)
+
+
+def random_address() -> str:
+    return to_checksum_address(os.urandom(20))
+
+
+def random_uint(bits: int = 256) -> int:
+    # Границы диапазона и "обычные" суммы
+    return random.choice([0, 1, 2**bits - 1, random.getrandbits(bits), random.getrandbits(64)])
+
+
+def random_path() -> list:
+    return [random_address() for _ in range(random.randint(1, 4))]
+
+
+def make_cases():
+    """Пары (быстрый вызов, эталонный вызов web3) со случайными аргументами"""
+    path, to, deadline = random_path(), random_address(), random_uint()
+    amount_in, amount_out_min = random_uint(), random_uint()
+    yield (
+        lambda: calldata.encode_swap_exact_eth_for_tokens(amount_out_min, path, to, deadline),
+        lambda: bean.encode_abi("swapExactETHForTokens", [amount_out_min, path, to, deadline]),
+    )
+    yield (
+        lambda: calldata.encode_swap_exact_tokens_for_eth(amount_in, amount_out_min, path, to, deadline),
+        lambda: bean.encode_abi("swapExactTokensForETH", [amount_in, amount_out_min, path, to, deadline]),
+    )
+    yield (
+        lambda: calldata.encode_swap_exact_tokens_for_tokens(amount_in, amount_out_min, path, to, deadline),
+        lambda: bean.encode_abi("swapExactTokensForTokens", [amount_in, amount_out_min, path, to, deadline]),
+    )
+
+    # path в iZiSwap - адреса токенов подряд (в общем случае с fee между ними)
+    izumi_path = os.urandom(random.choice([0, 20, 40, 43, 63, 64, 100]))
+    amount = random_uint(128)
+    swap_params = (izumi_path, to, amount, amount_out_min, deadline)
+    yield (
+        lambda: calldata.encode_swap_amount(*swap_params),
+        lambda: izumi.encode_abi("swapAmount", [swap_params]),
+    )
+    yield (
+        lambda: calldata.encode_unwrap_weth9(amount_out_min, to),
+        lambda: izumi.encode_abi("unwrapWETH9", [amount_out_min, to]),
+    )
+    yield (
+        calldata.encode_refund_eth,
+        lambda: izumi.encode_abi("refundETH", []),
+    )
+
+    yield (
+        lambda: calldata.encode_approve(to, amount_in),
+        lambda: erc20.encode_abi("approve", [to, amount_in]),
+    )
+
+    calls = [os.urandom(random.randint(0, 300)) for _ in range(random.randint(0, 5))]
+    yield (
+        lambda: calldata.encode_multicall(calls),
+        lambda: izumi.encode_abi("multicall", [calls]),
+    )
+
+
+def validate(cases: int) -> int:
+    mismatches = 0
+    for _ in range(cases):
+        for fast, reference in make_cases():
+            expected = bytes.fromhex(reference()[2:])
+            if fast() != expected:
+                mismatches += 1
+    return mismatches
+
+
+def benchmark(number: int):
+    path = [random_address(), random_address()]
+    to = random_address()
+    swap_params = (os.urandom(40), to, 10**18, 0, 1_900_000_000)
+
+    def fast_izumi():
+        return calldata.encode_multicall([
+            calldata.encode_swap_amount(*swap_params),
+            calldata.encode_unwrap_weth9(0, to),
+            calldata.encode_refund_eth(),
+        ])
+
+    def web3_izumi():
+        return izumi.encode_abi("multicall", [[
+            bytes.fromhex(izumi.encode_abi("swapAmount", [swap_params])[2:]),
+            bytes.fromhex(izumi.encode_abi("unwrapWETH9", [0, to])[2:]),
+            bytes.fromhex(izumi.encode_abi("refundETH", [])[2:]),
+        ]])
+
+    benches = {
+        "bean swapExactTokensForTokens": (
+            lambda: calldata.encode_swap_exact_tokens_for_tokens(10**18, 0, path, to, 1_900_000_000),
+            lambda: bean.encode_abi("swapExactTokensForTokens", [10**18, 0, path, to, 1_900_000_000]),
+        ),
+        "izumi multicall(swapAmount, unwrapWETH9, refundETH)": (fast_izumi, web3_izumi),
+    }
+
+    print(f"\n{'метод':<55}{'web3, мкс':>12}{'fast, мкс':>12}{'ускорение':>12}")
+    for name, (fast, reference) in benches.items():
+        fast_us = timeit.timeit(fast, number=number) / number * 1e6
+        reference_us = timeit.timeit(reference, number=number) / number * 1e6
+        print(f"{name:<55}{reference_us:>12.1f}{fast_us:>12.1f}{reference_us / fast_us:>11.1f}x")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=2000, help="Сколько наборов случайных аргументов проверить")
+    parser.add_argument("--number", type=int, default=5000, help="Повторов на замер скорости")
+    args = parser.parse_args()
+
+    mismatches = validate(args.cases)
+    print(f"Проверено {args.cases} наборов аргументов, расхождений с web3: {mismatches}")
+    if mismatches:
+        return 1
+
+    benchmark(args.number)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
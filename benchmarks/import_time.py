@@ -0,0 +1,100 @@
+"""
+Регрессионный бенчмарк времени старта
+
+Запускает `python -X importtime` для точек входа в отдельном процессе и проверяет:
+  - суммарное время импорта не превышает бюджет (по умолчанию 200 мс);
+  - при импорте не загружаются тяжелые модули (web3, pandas, eth_account, ...);
+  - main.py выводит меню и выходит (пункт 0) быстрее бюджета, с учетом старта интерпретатора.
+
+Запуск из корня проекта:
+    python benchmarks/import_time.py [--budget-ms 200] [--top 15]
+
+Код возврата 1, если бюджет превышен или тяжелый модуль загрузился при импорте.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Точки входа и модули, которые не должны загружаться при их импорте
+ENTRY_POINTS = {
+    "main": ("web3", "pandas", "eth_account", "msoffcrypto", "aiohttp", "numpy"),
+    "process": ("web3", "pandas", "eth_account", "msoffcrypto", "aiohttp"),
+    "config": ("web3", "pandas", "eth_account", "msoffcrypto"),
+}
+
+
+def measure(module: str):
+    """Импортирует module в чистом интерпретаторе, возвращает (записи importtime, загруженные модули)"""
+    code = f"import sys, {module}; print('\\n'.join(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Не удалось импортировать {module}:\n{result.stderr}")
+
+    records = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        records.append((name.strip(), int(self_us), int(cumulative_us)))
+    return records, set(result.stdout.split())
+
+
+def measure_menu() -> float:
+    """Полное время `python main.py` до выхода по пункту 0, мс"""
+    started_at = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "main.py"],
+        cwd=ROOT_DIR,
+        input="0\n",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return (time.perf_counter() - started_at) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=200, help="Бюджет на импорт точки входа, мс")
+    parser.add_argument("--top", type=int, default=15, help="Сколько самых долгих импортов выводить")
+    args = parser.parse_args()
+
+    failed = False
+    for module, forbidden in ENTRY_POINTS.items():
+        records, loaded = measure(module)
+
+        # cumulative самой точки входа включает все вложенные импорты
+        total_ms = next(cumulative for name, _, cumulative in reversed(records) if name == module) / 1000
+        heavy = sorted(name for name in forbidden if name in loaded)
+
+        status = "OK" if total_ms <= args.budget_ms and not heavy else "FAIL"
+        failed |= status == "FAIL"
+
+        print(f"\n[{status}] import {module}: {total_ms:.1f} мс (бюджет {args.budget_ms:.0f} мс)")
+        if heavy:
+            print(f"  Загружены тяжелые модули: {', '.join(heavy)}")
+
+        print("  Самые долгие импорты (cumulative):")
+        for name, _, cumulative in sorted(records, key=lambda record: -record[2])[: args.top]:
+            print(f"    {cumulative / 1000:8.1f} мс  {name}")
+
+    menu_ms = min(measure_menu() for _ in range(3))
+    status = "OK" if menu_ms <= args.budget_ms else "FAIL"
+    failed |= status == "FAIL"
+    print(f"\n[{status}] python main.py (меню и выход): {menu_ms:.1f} мс (бюджет {args.budget_ms:.0f} мс)")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Проверка и бенчмарк планировщика шагов аккаунтов (utils/scheduler.py)
+
+Проверяет, что отмена аккаунта во время паузы не ломает учет слотов и лимит
+одновременных шагов, затем замеряет, за сколько N слотов проходят аккаунты
+с паузами между шагами.
+
+Запуск из корня проекта:
+    python benchmarks/scheduler.py [--accounts 2000] [--workers 4] [--pause 0.2]
+
+Код возврата 1 при нарушении учета слотов.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.scheduler import Scheduler
+
+
+async def check_cancel_during_sleep(workers: int) -> list:
+    """Ошибки учета слотов после отмены аккаунтов, ожидающих в паузе"""
+    errors = []
+    scheduler = Scheduler(workers)
+
+    async def paused_account():
+        async with scheduler.slot():
+            await scheduler.sleep(10)
+
+    accounts = [asyncio.ensure_future(paused_account()) for _ in range(workers * 2)]
+    await asyncio.sleep(0.05)
+    for account in accounts:
+        account.cancel()
+    await asyncio.gather(*accounts, return_exceptions=True)
+    if scheduler.active != 0:
+        errors.append(f"после отмены занято слотов: {scheduler.active}")
+
+    peak = 0
+
+    async def step():
+        nonlocal peak
+        async with scheduler.slot():
+            peak = max(peak, scheduler.active)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(step() for _ in range(workers * 5)))
+    if peak > workers:
+        errors.append(f"одновременно шагов {peak} при лимите {workers}")
+    if scheduler.active != 0:
+        errors.append(f"после шагов занято слотов: {scheduler.active}")
+    return errors
+
+
+async def benchmark(accounts: int, workers: int, pause: float, steps: int = 3):
+    scheduler = Scheduler(workers)
+    peak = 0
+
+    async def account():
+        nonlocal peak
+        async with scheduler.slot():
+            for _ in range(steps):
+                peak = max(peak, scheduler.active)
+                await asyncio.sleep(0.001)
+                await scheduler.sleep(pause)
+
+    started_at = time.monotonic()
+    await asyncio.gather(*(account() for _ in range(accounts)))
+    elapsed = time.monotonic() - started_at
+    # С семафором аккаунт держит слот и во время пауз
+    semaphore_estimate = accounts / workers * steps * (pause + 0.001)
+    print(
+        f"{accounts} аккаунтов по {steps} шага с паузой {pause} сек., слотов {workers}: "
+        f"{elapsed:.2f} сек. (с семафором ~{semaphore_estimate:.0f} сек.), максимум шагов одновременно: {peak}"
+    )
+
+
+async def run(args) -> int:
+    errors = await check_cancel_during_sleep(args.workers)
+    print(f"Отмена во время паузы: {'ошибок нет' if not errors else '; '.join(errors)}")
+    if errors:
+        return 1
+
+    await benchmark(args.accounts, args.workers, args.pause)
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=2000, help="Сколько аккаунтов запустить")
+    parser.add_argument("--workers", type=int, default=4, help="Слотов планировщика")
+    parser.add_argument("--pause", type=float, default=0.2, help="Пауза между шагами, секунд")
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
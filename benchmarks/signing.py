@@ -0,0 +1,93 @@
+"""
+Бенчмарк подписи транзакций: в основном процессе и в пуле процессов (utils/signer.py)
+
+Подписывает одинаковый набор EIP-1559 транзакций для нескольких аккаунтов
+обоими способами, проверяет, что raw транзакции совпадают, и выводит подписей/сек.
+Пул дает выигрыш только при свободных ядрах: на одном ядре start_signer
+его не запускает.
+
+Запуск из корня проекта:
+    python benchmarks/signing.py [--tx 2000] [--accounts 50] [--processes 4]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eth_account import Account
+
+from utils import calldata
+from utils.signer import SigningService, sign_transaction
+
+
+def make_transactions(count: int, accounts: list) -> list:
+    """Транзакции свапа через роутер, как их собирает BeanDex"""
+    path = ["0xf817257fed379853cDe0fa4F97AB987181B1E5Ea", "0x760AfE86e5de5fa0Ee542fc7B7B713e1c5425701"]
+    transactions = []
+    for i in range(count):
+        account = accounts[i % len(accounts)]
+        data = calldata.encode_swap_exact_tokens_for_tokens(10**6 + i, 0, path, account.address, 1_900_000_000)
+        transactions.append((account, {
+            "from": account.address,
+            "to": "0xCa810D095e90Daae6e867c19DF6D9A8C56db2c89",
+            "data": "0x" + data.hex(),
+            "value": 0,
+            "gas": 300000,
+            "maxFeePerGas": 52 * 10**9,
+            "maxPriorityFeePerGas": 2 * 10**9,
+            "chainId": 10143,
+            "nonce": i // len(accounts),
+        }))
+    return transactions
+
+
+async def sign_inline(transactions: list) -> list:
+    return [await sign_transaction(account, tx_data) for account, tx_data in transactions]
+
+
+async def sign_in_pool(service: SigningService, transactions: list) -> list:
+    # Аккаунты работают конкурентно, как в Process.run_parallel
+    return await asyncio.gather(*(service.sign(account.address, tx_data) for account, tx_data in transactions))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tx", type=int, default=2000, help="Сколько транзакций подписать")
+    parser.add_argument("--accounts", type=int, default=50, help="Сколько аккаунтов")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 2, help="Процессов в пуле")
+    args = parser.parse_args()
+
+    accounts = [Account.create() for _ in range(args.accounts)]
+    transactions = make_transactions(args.tx, accounts)
+
+    started_at = time.perf_counter()
+    inline = asyncio.run(sign_inline(transactions))
+    inline_rate = len(transactions) / (time.perf_counter() - started_at)
+
+    service = SigningService([account.key.hex() for account in accounts], args.processes)
+    try:
+        # Прогрев: запуск процессов и загрузка ключей не входят в замер
+        asyncio.run(sign_in_pool(service, transactions[: max(args.processes * 2, service.min_batch)]))
+        started_at = time.perf_counter()
+        pooled = asyncio.run(sign_in_pool(service, transactions))
+        pool_rate = len(transactions) / (time.perf_counter() - started_at)
+    finally:
+        service.shutdown()
+
+    if pooled != inline:
+        print("Ошибка: подписи из пула не совпадают с подписями в основном процессе")
+        return 1
+
+    print(f"Транзакций: {len(transactions)}, аккаунтов: {len(accounts)}, процессов в пуле: {args.processes}")
+    print(f"  В основном процессе: {inline_rate:10.0f} подписей/сек")
+    print(f"  Пул процессов:       {pool_rate:10.0f} подписей/сек ({pool_rate / inline_rate:.1f}x)")
+    if (os.cpu_count() or 1) < 2:
+        print("  Ядро одно: start_signer оставит подпись в основном процессе")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,16 @@
-from utils.tools import get_accounts_data
+# Данные аккаунтов загружаются при первом обращении (config.PRIVATE_KEYS и т.п.),
+# а не при импорте: чтение Excel может запросить пароль
+ACCOUNT_FIELDS = ("ACCOUNT_NAMES", "PRIVATE_KEYS", "PROXIES", "EMAIL_ADDRESSES", "EMAIL_PASSWORDS")
 
-ACCOUNT_NAMES, PRIVATE_KEYS, PROXIES, EMAIL_ADDRESSES, EMAIL_PASSWORDS = (
-    get_accounts_data()
-)
+
+def __getattr__(name):
+    if name in ACCOUNT_FIELDS:
+        from utils.tools import get_accounts_data
+
+        values = dict(zip(ACCOUNT_FIELDS, get_accounts_data()))
+        globals().update(values)
+        return values[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 TOCKEN_PER_CHAIN = {
     "Monad": {
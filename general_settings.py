@@ -2,7 +2,7 @@
 
 
 SOFTWARE_MODE = 1  # 0 - последовательный запуск / 1 - параллельный запуск
-ACCOUNT_IN_STERAM = 0  # Количество аккаунтов в потоке при SOFTWARE_MODE = 1
+ACCOUNT_IN_STERAM = 0  # Сколько аккаунтов выполняют шаги одновременно при SOFTWARE_MODE = 1, аккаунт в паузе слот не занимает (0 - все аккаунты сразу)
 ACCOUNT_TO_WORK = 1  # 0 / 3 / 3, 20, 31 / [3, 20]
 TELEGRAM_NOTIFICATIONS = False
 
@@ -15,15 +15,67 @@ SLEEP_TIME_ACCOUNTS = (60, 120) # (минимум, максимум) секун
 PAUSE_BETWEEN_SWAPS = (7, 15)  # (минимум, максимум) секунд | Время сна между свапами
 PERCENTAGE_TO_SWAP = (2, 4)  # Процент баланса для свапа
 NUMBER_OF_SWAPS = (1, 3)  # Количество свапов
+PIPELINE_TRANSACTIONS = True  # Отправлять approve и свап подряд, не дожидаясь подтверждения approve
+MAX_TX_IN_FLIGHT = 2  # Максимум неподтвержденных транзакций на один аккаунт
+IZUMI_BATCH_COLLECT = True  # collect_izumi: все токены в MON одной multicall транзакцией
+APPROVE_MAX = False  # True - approve на максимальную сумму один раз на токен вместо approve на каждый свап
+SIGNER_PROCESSES = 0  # 0 - подпись транзакций в основном процессе / N - пул из N процессов (для сотен аккаунтов)
+SIGNER_BATCH_SIZE = 64  # Максимум транзакций в одной пачке на подпись
+SIGNER_BATCH_WAIT = 0.005  # Секунд ждать наполнения пачки на подпись
+SIGNER_MIN_BATCH = 8  # Пачка меньше этого подписывается в основном процессе (пересылка в пул дороже подписи)
 # RETRY SETTINGS
 MAXIMUM_RETRY = 20  # Количество повторений при ошибках
 SLEEP_TIME_RETRY = (5, 10)  # (минимум, максимум) секунд | Время сна после очередного повторения
 
+# RPC SETTINGS
+MONAD_RPC_URLS = [
+    "https://testnet-rpc.monad.xyz",
+    # Сюда можно добавить свои RPC Monad testnet, запросы распределяются между ними
+]
+RPC_RATE_LIMIT = 0  # Запросов в секунду на один RPC (0 - без ограничения)
+RPC_PROXY_RATE_LIMIT = 0  # Запросов в секунду через один прокси, по всем RPC (0 - без ограничения)
+RPC_CONCURRENCY_START = 8  # Начальный лимит одновременных запросов на один RPC через один прокси, дальше подбирается сам
+RPC_CONCURRENCY_MAX = 64  # Максимальный лимит одновременных запросов на один RPC через один прокси
+RPC_THROTTLE_RETRIES = 2  # Сколько раз повторить запрос, если все RPC ответили 429 / таймаутом
+RPC_THROTTLE_BACKOFF = 1  # Пауза перед первым таким повтором, секунд (дальше удваивается)
+RPC_HEDGE_DELAY = 0.5  # Через сколько секунд дублировать медленное чтение на следующий RPC (0 - не дублировать)
+RPC_EJECT_FAILURES = 3  # После скольких ошибок подряд RPC выводится из ротации
+RPC_COOLDOWN = 30  # На сколько секунд выводить RPC из ротации (растет при повторных выбываниях)
+RPC_HEALTH_INTERVAL = 30  # Как часто проверять высоту блока и chainId всех RPC, секунд
+RPC_MAX_BLOCK_LAG = 20  # На сколько блоков RPC может отставать от лучшего, прежде чем выбыть
+RPC_POOL_SIZE = 20  # Максимум открытых соединений к RPC на один прокси
+RPC_KEEPALIVE = 60  # Секунд держать простаивающее соединение открытым
+RPC_TIMEOUT = 30  # Таймаут одного RPC запроса, секунд
+FEE_CACHE_TTL = 2  # Секунд кешировать параметры газа (eth_feeHistory) для всех аккаунтов
+FEE_HISTORY_BLOCKS = 5  # Сколько последних блоков учитывать при расчете priority fee
+RECEIPT_POLL_INTERVAL = 1  # Как часто проверять новые блоки при ожидании подтверждений, секунд
+RECEIPT_TIMEOUT = 120  # Сколько ждать подтверждения транзакции, секунд
+QUOTE_BATCH_WAIT = 0.05  # Секунд копить запросы котировок от всех аккаунтов перед одним batch запросом
+QUOTE_BUCKET_DIGITS = 2  # Значащих цифр суммы в котировке: близкие суммы котируются одним запросом
+
+# GAS SETTINGS
+GAS_PROFILES_PATH = "./data/gas_profiles.json"  # Лимиты газа, выученные по квитанциям ("" - не сохранять между запусками)
+GAS_PROFILE_PERCENTILE = 95  # Процентиль gasUsed прошлых транзакций для лимита газа
+GAS_PROFILE_MARGIN = 0.1  # Запас сверху к процентилю (0.1 = +10%)
+GAS_PROFILE_MIN_SAMPLES = 5  # Сколько транзакций нужно, прежде чем перестать вызывать estimate_gas
+GAS_PROFILE_MAX_SAMPLES = 200  # Сколько последних замеров хранить на один метод
+
+# BALANCE CHECKER SETTINGS
+BALANCE_CHUNK_SIZE = 200  # Кошельков в одном запросе balances()
+BALANCE_CONCURRENCY = 10  # Сколько пачек запрашивать одновременно
+BALANCE_CHUNK_RETRIES = 3  # Попыток на одну пачку при ошибках
+BALANCE_TOP_N = 20  # Сколько кошельков показывать в консоли и Telegram (остальные - в файле выгрузки)
+BALANCE_EXPORT_FORMAT = "csv"  # "" - без выгрузки / "csv" / "jsonl" / "parquet" (нужен pyarrow), балансы выгружаются в wei
+BALANCE_EXPORT_PATH = "./data/balances"  # Файл выгрузки балансов, расширение добавляется по формату
+
 
 # DATA SETTINGS
 EXCEL_PASSWORD = False  # Password for Excel file, leave empty if no password
 EXCEL_PAGE_NAME = "Monad"
 EXCEL_FILE_PATH = "./data/account_data.xlsx"
+ACCOUNTS_SNAPSHOT = True  # Кешировать разобранный Excel в зашифрованный снимок рядом с ним (только при EXCEL_PASSWORD, обновляется при изменении файла)
+JOURNAL_PATH = "./data/journal.sqlite3"  # Журнал запуска для продолжения после падения ("" - без журнала)
+RESUME_RUN = True  # Продолжить прерванный запуск: пропустить обработанные аккаунты и задания, дождаться отправленных транзакций
 # Путь к файлу с аккаунтами для второго модуля
 
 # TELEGRAM SETTINGS
@@ -7,13 +7,8 @@ ROOT_DIR = Path(__file__).parent
 sys.path.append(str(ROOT_DIR))
 sys.path.append(str(ROOT_DIR / "src"))  # Добавляем путь к src
 
-from process import Process
-from src.modulse.balance_checker.balance_checker import BalanceChecker
-from config import ACCOUNT_NAMES, PRIVATE_KEYS, PROXIES
-from utils.tools import get_accounts_data, check_balances  # Импортирую check_balances из tools
-from eth_account import Account
-import asyncio
-
+# Тяжелые модули (web3, pandas, eth_account) импортируются только в выбранном пункте меню,
+# чтобы меню появлялось сразу. Проверка: python benchmarks/import_time.py
 
 
 def print_menu():
@@ -34,9 +29,14 @@ def main():
         choice = input("Выберите пункт меню: ")
 
         if choice == "1":
+            from process import Process
+
             process = Process()
             process.start()
         elif choice == "2":
+            import asyncio
+            from utils.tools import check_balances
+
             asyncio.run(check_balances())
         elif choice == "0":
             print("Выход из программы...")
@@ -1,21 +1,33 @@
 import sys
 import os
 import random
+import time
+import asyncio
 from pathlib import Path
+from typing import Tuple
 
 # Добавляем путь к корневой директории проекта
 ROOT_DIR = Path(__file__).parent
 sys.path.append(str(ROOT_DIR))
 
 # Импортируем настройки
-from general_settings import ACCOUNT_TO_WORK
-from src.modulse.runner import Runner
+from general_settings import (
+    ACCOUNT_TO_WORK,
+    SOFTWARE_MODE,
+    ACCOUNT_IN_STERAM,
+    JOURNAL_PATH,
+    RESUME_RUN,
+    SLEEP_MODE,
+    SLEEP_TIME_ACCOUNTS,
+)
 from utils.config import Config
+from utils.scheduler import Scheduler
 
 
 class Process:
     def __init__(self):
         self.accounts = None
+        self.journal = None
         self.get_accounts_data()
 
     def get_accounts_data(self):
@@ -54,34 +66,158 @@ class Process:
             # sys.exit(1)
             raise RuntimeError(f"Ошибка определения аккаунтов для обработки: {str(e)}")
 
+    async def run_account(self, account_index: int, config: Config, scheduler: Scheduler) -> Tuple[int, int]:
+        """Обрабатывает один аккаунт и возвращает количество успешных транзакций и невыполненных заданий"""
+        # web3 и модули загружаются только при запуске, а не при импорте process
+        from src.modulse.runner import Runner
+
+        account_name = self.accounts[0][account_index]
+        private_key = self.accounts[1][account_index]
+        proxy = self.accounts[2][account_index]
+
+        print(f"\n🔄 Обработка аккаунта {account_name}")
+
+        # Создаем и запускаем Runner для текущего аккаунта
+        runner = Runner(
+            account_name=account_name,
+            proxy=proxy,
+            private_key=private_key,
+            config=config,
+            journal=self.journal,
+            scheduler=scheduler,
+        )
+
+        # Запускаем выполнение заданий
+        return await runner.execute_tasks()
+
+    @staticmethod
+    def count_account(stats: dict, account_index: int, tx_count: int, failed_tasks: int):
+        """Учитывает результат аккаунта: аккаунт с невыполненным заданием считается неуспешным"""
+        stats["tx_count"] += tx_count
+        if failed_tasks:
+            stats["failed"] += 1
+            print(f"⚠️ Аккаунт №{account_index + 1}: не выполнено заданий: {failed_tasks}")
+        else:
+            stats["success"] += 1
+
+    async def run_sequential(self, accounts_to_work: list, config: Config) -> dict:
+        """Последовательный запуск (SOFTWARE_MODE = 0)"""
+        stats = {"success": 0, "failed": 0, "tx_count": 0}
+        scheduler = Scheduler()
+
+        for number, account_index in enumerate(accounts_to_work):
+            if SLEEP_MODE and number > 0:
+                pause = random.randint(SLEEP_TIME_ACCOUNTS[0], SLEEP_TIME_ACCOUNTS[1])
+                print(f"💤 Пауза {pause} сек. перед следующим аккаунтом")
+                await scheduler.sleep(pause)
+            try:
+                self.count_account(stats, account_index, *await self.run_account(account_index, config, scheduler))
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"❌ Ошибка при обработке аккаунта №{account_index + 1}: {str(e)}")
+                continue
+
+        return stats
+
+    async def run_parallel(self, accounts_to_work: list, config: Config) -> dict:
+        """
+        Параллельный запуск (SOFTWARE_MODE = 1)
+
+        Аккаунты выполняются шагами через общий планировщик: одновременно идет
+        не более ACCOUNT_IN_STERAM шагов, а аккаунт в паузе между заданиями и
+        свапами слот не занимает. При SLEEP_MODE старты аккаунтов разнесены
+        на SLEEP_TIME_ACCOUNTS.
+        """
+        stats = {"success": 0, "failed": 0, "tx_count": 0}
+        scheduler = Scheduler(ACCOUNT_IN_STERAM)
+
+        print(
+            f"⚡ Параллельный запуск: {len(accounts_to_work)} аккаунтов, "
+            f"одновременно шагов: {ACCOUNT_IN_STERAM or len(accounts_to_work)}"
+        )
+
+        async def worker(account_index: int, start_at: float):
+            async with scheduler.slot(start_at):
+                # Ошибка одного аккаунта не останавливает остальные
+                try:
+                    self.count_account(stats, account_index, *await self.run_account(account_index, config, scheduler))
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"❌ Ошибка при обработке аккаунта №{account_index + 1}: {str(e)}")
+
+        start_at = asyncio.get_running_loop().time()
+        workers = []
+        for number, account_index in enumerate(accounts_to_work):
+            if SLEEP_MODE and number > 0:
+                start_at += random.randint(SLEEP_TIME_ACCOUNTS[0], SLEEP_TIME_ACCOUNTS[1])
+            workers.append(worker(account_index, start_at))
+
+        await asyncio.gather(*workers)
+        return stats
+
+    @staticmethod
+    def print_summary(stats: dict, elapsed: float):
+        """Выводит итоговую статистику выполнения"""
+        minutes = max(elapsed, 1e-9) / 60
+        accounts_total = stats["success"] + stats["failed"]
+
+        print("\n📊 Итоги выполнения:")
+        print(f"   Аккаунтов обработано: {accounts_total} (успешно: {stats['success']}, с ошибкой: {stats['failed']})")
+        print(f"   Успешных транзакций: {stats['tx_count']}")
+        print(f"   Время выполнения: {elapsed:.1f} сек.")
+        print(f"   Скорость: {accounts_total / minutes:.2f} акк/мин, {stats['tx_count'] / minutes:.2f} tx/мин")
+
+    def unfinished_accounts(self, accounts_to_work: list) -> list:
+        """Аккаунты, которые текущий запуск по журналу еще не обработал полностью"""
+        done_accounts = self.journal.done_accounts()
+        return [
+            account_index for account_index in accounts_to_work
+            if self.accounts[0][account_index] not in done_accounts
+        ]
+
+    async def run(self) -> dict:
+        """Асинхронно обрабатывает аккаунты и возвращает статистику выполнения"""
+        from utils.gas_profiles import gas_profiles
+        from utils.journal import open_journal
+        from utils.rpc import rpc_sessions
+        from utils.signer import start_signer, stop_signer
+
+        accounts_to_work = self.get_accounts_to_work()
+        config = Config()  # Создаем экземпляр конфигурации
+
+        # Журнал запуска: после падения или Ctrl+C следующий запуск продолжит с места остановки
+        self.journal = open_journal(JOURNAL_PATH, RESUME_RUN)
+        if self.journal is not None:
+            remaining = self.unfinished_accounts(accounts_to_work)
+            if len(remaining) < len(accounts_to_work):
+                print(f"⏭ Пропуск {len(accounts_to_work) - len(remaining)} аккаунтов, обработанных до прерывания запуска")
+            accounts_to_work = remaining
+
+        started_at = time.monotonic()
+        # Ключи передаются пулу подписи один раз (при SIGNER_PROCESSES > 0)
+        start_signer([self.accounts[1][account_index] for account_index in accounts_to_work])
+        try:
+            # Сессии закрываются, когда их не использует ни один запуск (в боте /balance может идти параллельно)
+            async with rpc_sessions():
+                if SOFTWARE_MODE == 1:
+                    stats = await self.run_parallel(accounts_to_work, config)
+                else:
+                    stats = await self.run_sequential(accounts_to_work, config)
+            # Запуск с невыполненными заданиями остается незавершенным: повторный запуск доделает только их
+            if self.journal is not None and not self.unfinished_accounts(accounts_to_work):
+                self.journal.finish_run()
+        finally:
+            stop_signer()
+            gas_profiles.save()
+            if self.journal is not None:
+                self.journal.close()
+        self.print_summary(stats, time.monotonic() - started_at)
+        return stats
+
     def start(self, exit_on_finish=True):
         """Запускает процесс обработки аккаунтов"""
         try:
-            accounts_to_work = self.get_accounts_to_work()
-            config = Config()  # Создаем экземпляр конфигурации
-
-            for account_index in accounts_to_work:
-                try:
-                    account_name = self.accounts[0][account_index]
-                    private_key = self.accounts[1][account_index]
-                    proxy = self.accounts[2][account_index]
-
-                    print(f"\n🔄 Обработка аккаунта {account_name}")
-
-                    # Создаем и запускаем Runner для текущего аккаунта
-                    runner = Runner(
-                        account_name=account_name,
-                        proxy=proxy,
-                        private_key=private_key,
-                        config=config,
-                    )
-
-                    # Запускаем выполнение заданий
-                    runner.execute_tasks()
-
-                except Exception as e:
-                    print(f"❌ Ошибка при обработке аккаунта {account_name}: {str(e)}")
-                    continue
+            asyncio.run(self.run())
 
             print("\n✅ Все задания выполнены. Программа завершает работу...")
             if exit_on_finish:
@@ -1,68 +1,84 @@
-import urllib3
+import asyncio
 import random
-
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 import time
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple, Union
+
 from eth_account import Account
-from web3 import Web3
-from utils.networks import MonadRPC
-from src.modulse.SwapTasks.constants import BEAN_CONTRACT, BEAN_ABI, BEAN_TOKENS
+from web3 import AsyncWeb3
+from src.modulse.SwapTasks.constants import BEAN_CONTRACT, BEAN_ABI, BEAN_TOKENS, ZERO_ADDRESS
 from utils.constants import ERC20_ABI
 from utils.config import Config
 from decimal import Decimal
 from utils.logger import logger
-from general_settings import PAUSE_BETWEEN_SWAPS, PERCENTAGE_TO_SWAP, NUMBER_OF_SWAPS
+from utils.nonce_manager import NonceManager
+from utils.fee_oracle import get_fee_oracle
+from utils.tx_pipeline import TxPipeline, confirm_all
+from utils.allowance import allowance_cache, MAX_UINT256
+from utils.contracts import get_contract
+from utils.rpc import get_chain_id
+from utils import calldata
+from utils.signer import sign_transaction
+from utils.receipt_tracker import get_receipt_tracker
+from utils.gas_profiles import gas_profiles
+from utils.balance_ledger import BalanceLedger
+from utils.scheduler import Scheduler
+from src.modulse.SwapTasks.quotes import get_quote_book, apply_slippage
+from general_settings import (
+    PAUSE_BETWEEN_SWAPS,
+    PERCENTAGE_TO_SWAP,
+    NUMBER_OF_SWAPS,
+    PIPELINE_TRANSACTIONS,
+    APPROVE_MAX,
+)
 
 
 class BeanDex:
     def __init__(
-        self, private_key: str, proxy: Optional[str] = None, config: Config = None
+        self,
+        private_key: str,
+        web3: AsyncWeb3,
+        proxy: Optional[str] = None,
+        config: Config = None,
+        nonce_manager: Optional[NonceManager] = None,
+        tx_pipeline: Optional[TxPipeline] = None,
+        ledger: Optional[BalanceLedger] = None,
+        scheduler: Optional[Scheduler] = None,
     ):
-        self.web3 = Web3(
-            Web3.HTTPProvider(
-                MonadRPC,
-                request_kwargs={
-                    "proxies": {"http": f"http://{proxy}"},
-                    "verify": False,
-                    "timeout": 30,
-                },
-            )
-        )
+        # web3 общий для всех модулей с этим прокси (см. utils.rpc.get_web3)
+        self.web3 = web3
         self.account = Account.from_key(private_key)
+        # nonce выдается локально, менеджер общий для всех модулей Runner'а
+        self.nonce_manager = nonce_manager or NonceManager(web3, self.account.address)
+        self.fee_oracle = get_fee_oracle(web3)
+        self.tx_pipeline = tx_pipeline or TxPipeline()
+        # Балансы аккаунта ведутся локально по квитанциям, ledger общий для всех модулей Runner'а
+        self.ledger = ledger or BalanceLedger(self.account.address)
+        # Паузы между свапами отдают слот планировщика другим аккаунтам
+        self.scheduler = scheduler or Scheduler()
+        self.allowances = allowance_cache
+        self.receipts = get_receipt_tracker(web3)
+        # Котировки getAmountsOut общие для всех аккаунтов в пределах блока
+        self.quotes = get_quote_book(web3)
+        # Лимиты газа по gasUsed прошлых транзакций (общие для всех аккаунтов)
+        self.gas_profiles = gas_profiles
         self.proxy = proxy
-        self.router_contract = self.web3.eth.contract(
-            address=self.web3.to_checksum_address(BEAN_CONTRACT), abi=BEAN_ABI
-        )
-        self.config = config
-
-
-    def get_gas_params(self) -> Dict[str, int]:
-        # try:
-        latest_block = self.web3.eth.get_block("latest")
-        base_fee = latest_block["baseFeePerGas"]
-        max_priority_fee = self.web3.eth.max_priority_fee
-        max_fee = base_fee + max_priority_fee
+        # Контракты и разобранные ABI общие для всех аккаунтов с этим web3
+        self.router_contract = get_contract(self.web3, BEAN_CONTRACT, BEAN_ABI)
+        self.config = config or Config()
 
-        gas_params = {
-            "maxFeePerGas": max_fee,
-            "maxPriorityFeePerGas": max_priority_fee,
-        }
+    async def get_gas_params(self) -> Dict[str, int]:
+        # Общий для всех модулей и аккаунтов кеш eth_feeHistory
+        return await self.fee_oracle.get_gas_params(self.web3)
 
-        return gas_params
 
-
-    def get_token_balance(self, token: str) -> float:
+    async def get_token_balance(self, token: str) -> float:
         try:
             if token == "native":
-                balance_wei = self.web3.eth.get_balance(self.account.address)
+                balance_wei = await self.web3.eth.get_balance(self.account.address)
                 return float(self.web3.from_wei(balance_wei, "ether"))
 
-            token_contract = self.web3.eth.contract(
-                address=self.web3.to_checksum_address(BEAN_TOKENS[token]["address"]),
-                abi=ERC20_ABI,
-            )
-            balance = token_contract.functions.balanceOf(self.account.address).call()
+            token_contract = get_contract(self.web3, BEAN_TOKENS[token]["address"], ERC20_ABI)
+            balance = await token_contract.functions.balanceOf(self.account.address).call()
             decimals = BEAN_TOKENS[token]["decimals"]
             amount = float(Decimal(str(balance)) / Decimal(str(10**decimals)))
             return amount
@@ -71,44 +87,44 @@ class BeanDex:
             logger.error(f"Failed to get {token} balance: {repr(e)}")
             return 0
 
-    def get_tokens_with_balance(
+    async def get_tokens_with_balance(
         self,
     ) -> List[Tuple[str, float]]:
         # Получение токенов с не нулевым балансом. Иначе возращает пустой список.
         """Get list of tokens with non-zero balances."""
         tokens_with_balance = []
 
+        # Native и все токены из ledger'а: из сети (одним вызовом multi-balance контракта) только в первый раз
+        tokens = list(BEAN_TOKENS)
+        balances = await self.ledger.balances(
+            self.web3,
+            [ZERO_ADDRESS] + [BEAN_TOKENS[token]["address"] for token in tokens],
+        )
+
         # Check native token balance
-        native_balance = self.web3.eth.get_balance(self.account.address)
+        native_balance = balances[0]
         if native_balance > 0:
             native_amount = float(self.web3.from_wei(native_balance, "ether"))
             tokens_with_balance.append(("native", native_amount))
 
         # Check other tokens
-        for token in BEAN_TOKENS:
-            try:
-                token_contract = self.web3.eth.contract(
-                    address=self.web3.to_checksum_address(
-                        BEAN_TOKENS[token]["address"]
-                    ),
-                    abi=ERC20_ABI,
-                )
-                balance = token_contract.functions.balanceOf(
-                    self.account.address
-                ).call()
-
-                if balance > 0:
-                    decimals = BEAN_TOKENS[token]["decimals"]
-                    amount = float(Decimal(str(balance)) / Decimal(str(10**decimals)))
-                    tokens_with_balance.append((token, amount))
-
-            except Exception as e:
-                logger.error(f"Failed to get balance for {token}: {repr(e)}")
-                continue
+        for token, balance in zip(tokens, balances[1:]):
+            if balance > 0:
+                decimals = BEAN_TOKENS[token]["decimals"]
+                amount = float(Decimal(str(balance)) / Decimal(str(10**decimals)))
+                tokens_with_balance.append((token, amount))
 
         return tokens_with_balance
 
-    def approve_token(self, token: str, amount: int) -> Optional[str]:
+    async def approve_token(self, token: str, amount: int, wait: bool = True) -> Union[bool, str, asyncio.Task, None]:
+        """
+        Approve токена для роутера, если текущего allowance не хватает
+
+        Returns:
+            True - allowance уже достаточен, approve не нужен;
+            хеш (при wait=False - asyncio.Task с хешем) - approve отправлен;
+            None - approve не удался, свап этого токена ревертнется
+        """
         try:
             # Проверяем существование токена
             if token not in BEAN_TOKENS:
@@ -119,71 +135,107 @@ class BeanDex:
                 f"BeanDex: Начинаю approve для токена {token} на сумму {amount}"
             )
 
-            # Создаем контракт токена
-            token_contract = self.web3.eth.contract(
-                address=self.web3.to_checksum_address(BEAN_TOKENS[token]["address"]),
-                abi=ERC20_ABI,
+            # Проверяем текущий апрув (локальная модель, allowance() читается один раз)
+            current_allowance = await self.allowances.get(
+                self.web3, self.account.address, BEAN_TOKENS[token]["address"], BEAN_CONTRACT
             )
 
-            logger.info(f"BeanDex: Контракт токена {token} успешно создан")
-
-            # Проверяем текущий апрув
-            current_allowance = token_contract.functions.allowance(
-                self.account.address, BEAN_CONTRACT
-            ).call()
-
             # Если текущий апрув достаточен, не делаем новый
             if current_allowance >= amount:
                 logger.info(
                     f"BeanDex: Текущий allowance для {token} достаточен ({current_allowance} >= {amount})"
                 )
-                return None
+                return True
 
             logger.info(
                 f"BeanDex: Текущий allowance для {token}: {current_allowance}, требуется: {amount}"
             )
-            nonce = self.web3.eth.get_transaction_count(self.account.address)
             # Получаем параметры газа
-            gas_params = self.get_gas_params()
-
-            # Создаем транзакцию для апрува
-            transaction = token_contract.functions.approve(
-                BEAN_CONTRACT, amount
-            ).build_transaction(
-                {
-                    "from": self.account.address,
-                    "nonce": nonce,
-                    "gas": 100000,  # Лимит газа для апрува
-                    "maxFeePerGas": gas_params[
-                        "maxFeePerGas"
-                    ],  # Максимальная цена газа
-                    "maxPriorityFeePerGas": gas_params[
-                        "maxPriorityFeePerGas"
-                    ],  # Приоритетная цена газа
-                }
-            )
+            gas_params = await self.get_gas_params()
+
+            # При APPROVE_MAX апрув делается один раз на максимальную сумму
+            approve_amount = MAX_UINT256 if APPROVE_MAX else amount
+
+            # Создаем транзакцию для апрува: все поля заданы явно, build_transaction
+            # не нужен и не делает eth_chainId (nonce выдается при отправке)
+            transaction = {
+                "from": self.account.address,
+                "to": BEAN_TOKENS[token]["address"],
+                "data": "0x" + calldata.encode_approve(BEAN_CONTRACT, approve_amount).hex(),
+                "value": 0,
+                "gas": 100000,  # Лимит газа для апрува
+                "maxFeePerGas": gas_params["maxFeePerGas"],  # Максимальная цена газа
+                "maxPriorityFeePerGas": gas_params["maxPriorityFeePerGas"],  # Приоритетная цена газа
+                "chainId": await get_chain_id(self.web3),
+            }
+            # Лимит по профилю прошлых approve вместо фиксированных 100000
+            transaction["gas"] = self.gas_profiles.limit(transaction) or transaction["gas"]
 
             # Отправляем транзакцию через execute_transaction
-            return self.execute_transaction(transaction)
+            pending = await self.execute_transaction(transaction, wait=wait)
+            self.allowances.track_approve(
+                self.account.address,
+                BEAN_TOKENS[token]["address"],
+                BEAN_CONTRACT,
+                approve_amount,
+                pending,
+            )
+            return pending
 
         except Exception as e:
             logger.error(f"BeanDex: Ошибка при approve токена {token}: {repr(e)}")
             return None
 
-    def execute_transaction(self, tx_data: dict) -> str:
+    async def wait_for_receipt(self, tx_hash, tx_data: Optional[dict] = None, reserved: int = 0) -> Optional[str]:
+        """
+        Ждет подтверждения транзакции
+
+        Args:
+            tx_hash: Хеш отправленной транзакции
+            tx_data: Данные транзакции - по квитанции обновляются профиль газа и ledger
+            reserved: Резерв баланса под транзакцию, снимается после подтверждения
+
+        Returns:
+            Optional[str]: Хеш транзакции или None, если она не удалась
+        """
+        try:
+            # Ждем подтверждения с таймаутом (общий трекер блоков вместо опроса по транзакции)
+            receipt = await self.receipts.wait(self.web3, tx_hash)
+            if tx_data is not None:
+                self.gas_profiles.observe(tx_data, receipt)
+                self.ledger.apply_receipt(receipt, tx_data)
+
+            if receipt["status"] == 1:
+                logger.info(f"BeanDex: Транзакция успешна: {tx_hash.hex()}")
+                return tx_hash.hex()
+            else:
+                logger.error(f"BeanDex: Транзакция не удалась: {tx_hash.hex()}")
+                return None
+
+        except Exception as e:
+            # Без квитанции балансы неизвестны - ledger перечитает их из сети
+            self.ledger.invalidate()
+            logger.error(f"BeanDex: Ошибка при ожидании транзакции {tx_hash.hex()}: {repr(e)}")
+            return None
+        finally:
+            self.ledger.release(reserved)
+
+    async def execute_transaction(self, tx_data: dict, wait: bool = True):
         """
         Выполняет транзакцию и ждет подтверждения
 
         Args:
             tx_data (dict): Данные транзакции
+            wait (bool): False - вернуть задачу ожидания сразу после отправки
 
         Returns:
-            str: Хеш транзакции
+            str: Хеш транзакции (при wait=False - asyncio.Task с хешем)
         """
         try:
-            # Проверяем баланс
-            current_balance = self.web3.eth.get_balance(self.account.address)
-            gas_price = self.web3.eth.gas_price
+            # Проверяем баланс по ledger'у (за вычетом резерва под неподтвержденные транзакции)
+            current_balance = await self.ledger.available_native(self.web3)
+            # Верхняя граница цены газа уже есть в транзакции, отдельный gas_price не нужен
+            gas_price = tx_data.get("maxFeePerGas") or (await self.get_gas_params())["maxFeePerGas"]
             gas_limit = tx_data.get("gas", 21000)
 
             required_balance = gas_price * gas_limit
@@ -196,32 +248,38 @@ class BeanDex:
                 )
                 return None
 
-            # Подписываем транзакцию
-            signed_tx = self.web3.eth.account.sign_transaction(
-                tx_data, self.account.key
-            )
-
-            # Отправляем подписанную транзакцию, используя raw_transaction
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-
-            # Ждем подтверждения с таймаутом
-            receipt = self.web3.eth.wait_for_transaction_receipt(
-                tx_hash, poll_latency=2, timeout=120
-            )
+            # Подписываем и отправляем транзакцию с nonce из NonceManager
+            async def sign_and_send(nonce: int):
+                tx_data["nonce"] = nonce
+                # Подпись в пуле процессов, если он запущен (см. utils/signer.py)
+                raw_transaction = await sign_transaction(self.account, tx_data)
+                # Отправляем подписанную транзакцию, используя raw_transaction
+                return await self.web3.eth.send_raw_transaction(raw_transaction)
 
-            if receipt["status"] == 1:
-                logger.info(f"BeanDex: Транзакция успешна: {tx_hash.hex()}")
-                return tx_hash.hex()
-            else:
-                logger.error(f"BeanDex: Транзакция не удалась: {tx_hash.hex()}")
-                return None
+            self.ledger.reserve(required_balance)
+            try:
+                pending = await self.tx_pipeline.submit(
+                    lambda: self.nonce_manager.send(sign_and_send),
+                    lambda tx_hash: self.wait_for_receipt(tx_hash, tx_data, required_balance),
+                )
+            except Exception:
+                self.ledger.release(required_balance)
+                raise
+            if not wait:
+                return pending
+            return await pending
 
         except Exception as e:
             logger.error(f"BeanDex: Ошибка при отправке транзакции: {repr(e)}")
             return None
 
-    def generate_swap_data(
-        self, token_in: str, token_out: str, amount_in: int, min_amount_out: int
+    async def generate_swap_data(
+        self,
+        token_in: str,
+        token_out: str,
+        amount_in: int,
+        min_amount_out: Optional[int] = None,
+        gas_limit: Optional[int] = None,
     ) -> Dict:
         """
         Генерация данных для транзакции обмена токенов
@@ -230,7 +288,8 @@ class BeanDex:
             token_in: Символ входящего токена
             token_out: Символ исходящего токена
             amount_in: Количество входящего токена
-            min_amount_out: Минимальное количество исходящего токена
+            min_amount_out: Минимальное количество исходящего токена (None - по котировке с учетом slippage)
+            gas_limit: Лимит газа без estimate_gas (approve еще не подтвержден)
 
         Returns:
             Dict: Данные для транзакции
@@ -308,42 +367,49 @@ class BeanDex:
 
             #logger.info(f"BeanDex: Swap path: {' -> '.join(path)}")
 
+            if min_amount_out is None:
+                min_amount_out = await self.get_min_amount_out(amount_in, path)
+
             # Определяем метод обмена и значение value
+            # (calldata кодируется напрямую, см. utils/calldata.py)
             if token_in == "native":
-                swap_method = self.router_contract.functions.swapExactETHForTokens(
+                data = calldata.encode_swap_exact_eth_for_tokens(
                     min_amount_out, path, self.account.address, deadline
                 )
                 value = amount_in
             elif token_out == "native":
-                swap_method = self.router_contract.functions.swapExactTokensForETH(
+                data = calldata.encode_swap_exact_tokens_for_eth(
                     amount_in, min_amount_out, path, self.account.address, deadline
                 )
                 value = 0
             else:
-                swap_method = self.router_contract.functions.swapExactTokensForTokens(
+                data = calldata.encode_swap_exact_tokens_for_tokens(
                     amount_in, min_amount_out, path, self.account.address, deadline
                 )
                 value = 0
 
-            # Оцениваем газ для транзакции
-            gas_estimate = swap_method.estimate_gas(
-                {"from": self.account.address, "value": value}
-            )
+            tx_data = {
+                "from": self.account.address,
+                "to": self.router_contract.address,
+                "data": "0x" + data.hex(),
+                "value": value,
+            }
+
+            # Лимит по профилю прошлых свапов этим методом и путем, estimate_gas - только без профиля
+            gas_limit = self.gas_profiles.limit(tx_data) or gas_limit
+            if gas_limit is None:
+                # Оцениваем газ для транзакции
+                gas_estimate = await self.web3.eth.estimate_gas(tx_data)
 
-            # Добавляем 30% к оценке газа для надежности
-            gas_limit = int(gas_estimate * 1.3)
+                # Добавляем 30% к оценке газа для надежности
+                gas_limit = int(gas_estimate * 1.3)
 
-            # Создаем транзакцию
-            tx_data = swap_method.build_transaction(
+            # Создаем транзакцию (те же поля, что заполняет build_transaction)
+            tx_data.update(
                 {
-                    "from": self.account.address,
-                    "value": value,
                     "gas": gas_limit,  # Используем gas_limit вместо gas_estimate
-                    "nonce": self.web3.eth.get_transaction_count(self.account.address),
-                    "maxFeePerGas": self.get_gas_params()["maxFeePerGas"],
-                    "maxPriorityFeePerGas": self.get_gas_params()[
-                        "maxPriorityFeePerGas"
-                    ],
+                    **(await self.get_gas_params()),
+                    "chainId": await get_chain_id(self.web3),
                 }
             )
 
@@ -353,9 +419,27 @@ class BeanDex:
             logger.error(f"BeanDex: Error generating swap data: {repr(e)}")
             return {}
 
-    def swap(self, percentage_to_swap: float = None, type: str = "swap") -> list:
+    async def get_min_amount_out(self, amount_in: int, path: List[str]) -> int:
+        """Минимум на выходе по котировке getAmountsOut и slippage из Config (0 - котировку получить не удалось)"""
+        # Прямой wrap/unwrap (путь из одного токена) роутер не котирует
+        if len(path) < 2:
+            return 0
+        try:
+            amount_out = await self.quotes.bean_amount_out(self.web3, amount_in, path)
+        except Exception as e:
+            logger.warning(f"BeanDex: Не удалось получить котировку, свап без min_amount_out: {repr(e)}")
+            return 0
+        return apply_slippage(amount_out, self.config.transaction_settings["slippage"])
+
+    def pending_approve_gas_limit(self, approve_pending) -> Optional[int]:
+        """Пока approve не подтвержден, estimate_gas свапа ревертнется - берем лимит из конфига"""
+        if isinstance(approve_pending, asyncio.Future):
+            return self.config.network_settings["gas_limit"]
+        return None
+
+    async def swap(self, percentage_to_swap: float = None, type: str = "swap") -> list:
         try:
-            tokens_with_balance = self.get_tokens_with_balance()
+            tokens_with_balance = await self.get_tokens_with_balance()
             if not tokens_with_balance:
                 raise ValueError("BeanDex: No tokens available for swap")
 
@@ -377,6 +461,7 @@ class BeanDex:
 
                 random.shuffle(tokens_to_collect)
 
+                tx_hashes = []
                 for token, amount in tokens_to_collect:
                     try:
                         # Проверяем, является ли это последним токеном
@@ -390,35 +475,37 @@ class BeanDex:
                         amount_wei = int(amount * (10**decimals))
 
                         # Проверяем allowance
-                        token_contract = self.web3.eth.contract(
-                            address=self.web3.to_checksum_address(token_address),
-                            abi=ERC20_ABI,
+                        allowance = await self.allowances.get(
+                            self.web3, self.account.address, token_address, BEAN_CONTRACT
                         )
-                        allowance = token_contract.functions.allowance(
-                            self.account.address, BEAN_CONTRACT
-                        ).call()
 
                         # Если allowance недостаточно, делаем approve
+                        approve_pending = True
                         if allowance < amount_wei:
                             logger.info(f"BeanDex: Approving {token}")
-                            self.approve_token(token, amount_wei)
+                            approve_pending = await self.approve_token(
+                                token, amount_wei, wait=not PIPELINE_TRANSACTIONS
+                            )
+                            if approve_pending is None:
+                                logger.error(f"BeanDex: Approve {token} failed, skipping swap")
+                                continue
 
                             # Добавляем случайную паузу после approve, если это не последний токен
-                            if not is_last_token:
+                            if not PIPELINE_TRANSACTIONS and not is_last_token:
                                 pause = random.randint(
                                     PAUSE_BETWEEN_SWAPS[0], PAUSE_BETWEEN_SWAPS[1]
                                 )
                                 logger.info(
                                     f"BeanDex: Pause {pause} seconds after approve"
                                 )
-                                time.sleep(pause)
+                                await self.scheduler.sleep(pause)
 
                         # Генерируем данные для свапа
-                        swap_data = self.generate_swap_data(
+                        swap_data = await self.generate_swap_data(
                             token_in=token,
                             token_out="native",
                             amount_in=amount_wei,
-                            min_amount_out=0,  # TODO: Добавить расчет min_amount_out
+                            gas_limit=self.pending_approve_gas_limit(approve_pending),
                         )
 
                         if not swap_data:
@@ -427,12 +514,19 @@ class BeanDex:
                             )
                             continue
 
-                        # Выполняем свап
-                        tx_hash = self.execute_transaction(swap_data)
+                        # Выполняем свап (в режиме конвейера approve и свап подтверждаются параллельно)
+                        swap_pending = await self.execute_transaction(
+                            swap_data, wait=not PIPELINE_TRANSACTIONS
+                        )
+                        _, tx_hash = await confirm_all(approve_pending, swap_pending)
                         if tx_hash:
                             logger.success(
                                 f"BeanDex: Successfully swapped {token} to MON: {tx_hash}"
                             )
+                            self.allowances.spend(
+                                self.account.address, token_address, BEAN_CONTRACT, amount_wei
+                            )
+                            tx_hashes.append(tx_hash)
                         else:
                             logger.error(f"BeanDex: Failed to swap {token} to MON")
 
@@ -441,7 +535,7 @@ class BeanDex:
                             PAUSE_BETWEEN_SWAPS[0], PAUSE_BETWEEN_SWAPS[1]
                         )
                         logger.info(f"BeanDex: Pause {pause} seconds before next swap")
-                        time.sleep(pause)
+                        await self.scheduler.sleep(pause)
 
                     except Exception as e:
                         error_message = (
@@ -452,12 +546,18 @@ class BeanDex:
                         )
                         continue
 
-                return None
+                return tx_hashes
             else:  # режим swap
                 num_swaps = random.randint(NUMBER_OF_SWAPS[0], NUMBER_OF_SWAPS[1])
                 logger.info(f"BeanDex: Количество свапов: {num_swaps}")
                 tx_hashes = []
                 for i in range(num_swaps):
+                    # Балансы из ledger'а уже учитывают предыдущие свапы, запросов к RPC нет
+                    if i:
+                        tokens_with_balance = await self.get_tokens_with_balance()
+                        if not tokens_with_balance:
+                            break
+
                     # Генерируем новый процент для каждого свапа
                     percentage_to_swap = random.uniform(
                         PERCENTAGE_TO_SWAP[0], PERCENTAGE_TO_SWAP[1]
@@ -504,30 +604,47 @@ class BeanDex:
                     logger.info(f"BeanDex: Swap amount: {swap_amount} {token_in}")
 
                     # 5. Approve для не-нативных токенов
+                    approve_pending = True
                     if token_in != "native":
                         logger.info(f"BeanDex: Approving {token_in}")
-                        self.approve_token(token_in, swap_amount_wei)
-                        pause = random.randint(5, 10)
-                        logger.info(f"BeanDex: Pause {pause} seconds after approve")
-                        time.sleep(pause)
+                        approve_pending = await self.approve_token(
+                            token_in, swap_amount_wei, wait=not PIPELINE_TRANSACTIONS
+                        )
+                        if approve_pending is None:
+                            logger.error(f"BeanDex: Approve {token_in} failed, skipping swap")
+                            continue
+                        if not PIPELINE_TRANSACTIONS:
+                            pause = random.randint(5, 10)
+                            logger.info(f"BeanDex: Pause {pause} seconds after approve")
+                            await self.scheduler.sleep(pause)
 
                     # 6. Выполнение обмена
-                    swap_data = self.generate_swap_data(
+                    swap_data = await self.generate_swap_data(
                         token_in=token_in,
                         token_out=token_out,
                         amount_in=swap_amount_wei,
-                        min_amount_out=0,
+                        gas_limit=self.pending_approve_gas_limit(approve_pending),
                     )
 
                     if not swap_data:
                         logger.error("BeanDex: Failed to generate swap data")
                         continue
 
-                    tx_hash = self.execute_transaction(swap_data)
+                    swap_pending = await self.execute_transaction(
+                        swap_data, wait=not PIPELINE_TRANSACTIONS
+                    )
+                    _, tx_hash = await confirm_all(approve_pending, swap_pending)
                     if tx_hash:
                         logger.success(
                             f"BeanDex: Successfully swapped {token_in} to {token_out}: {tx_hash}"
                         )
+                        if token_in != "native":
+                            self.allowances.spend(
+                                self.account.address,
+                                BEAN_TOKENS[token_in]["address"],
+                                BEAN_CONTRACT,
+                                swap_amount_wei,
+                            )
                         tx_hashes.append(tx_hash)
                     else:
                         logger.error(
@@ -539,7 +656,7 @@ class BeanDex:
                         PAUSE_BETWEEN_SWAPS[0], PAUSE_BETWEEN_SWAPS[1]
                     )
                     logger.info(f"BeanDex: Pause {pause} seconds before next swap")
-                    time.sleep(pause)
+                    await self.scheduler.sleep(pause)
                 return tx_hashes
 
         except Exception as e:
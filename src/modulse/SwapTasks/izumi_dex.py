@@ -1,52 +1,75 @@
-import urllib3
+import asyncio
 import random
-
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 import time
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple, Union
+
 from eth_account import Account
-from web3 import Web3
-from utils.networks import MonadRPC
-from src.modulse.SwapTasks.constants import IZUMI_CONTRACT, IZUMI_ABI, IZUMI_TOKENS
-from utils.constants import ERC20_ABI
+from web3 import AsyncWeb3
+from src.modulse.SwapTasks.constants import IZUMI_CONTRACT, IZUMI_ABI, IZUMI_TOKENS, ZERO_ADDRESS
 from utils.config import Config
 from decimal import Decimal
 from utils.logger import logger
-from general_settings import PAUSE_BETWEEN_SWAPS, PERCENTAGE_TO_SWAP, NUMBER_OF_SWAPS
+from utils.nonce_manager import NonceManager
+from utils.fee_oracle import get_fee_oracle
+from utils.tx_pipeline import TxPipeline, confirm_all
+from utils.allowance import allowance_cache, MAX_UINT256
+from utils.contracts import get_contract
+from utils.rpc import get_chain_id
+from utils import calldata
+from utils.signer import sign_transaction
+from utils.receipt_tracker import get_receipt_tracker
+from utils.gas_profiles import gas_profiles
+from utils.balance_ledger import BalanceLedger
+from utils.scheduler import Scheduler
+from general_settings import (
+    PAUSE_BETWEEN_SWAPS,
+    PERCENTAGE_TO_SWAP,
+    NUMBER_OF_SWAPS,
+    PIPELINE_TRANSACTIONS,
+    APPROVE_MAX,
+    IZUMI_BATCH_COLLECT,
+)
+
+
+# Лимит газа на один swapAmount в multicall
+IZUMI_SWAP_GAS = 500000
 
 
 class IzumiDex:
     def __init__(
-        self, private_key: str, proxy: Optional[str] = None, config: Config = None
+        self,
+        private_key: str,
+        web3: AsyncWeb3,
+        proxy: Optional[str] = None,
+        config: Config = None,
+        nonce_manager: Optional[NonceManager] = None,
+        tx_pipeline: Optional[TxPipeline] = None,
+        ledger: Optional[BalanceLedger] = None,
+        scheduler: Optional[Scheduler] = None,
     ):
-        self.web3 = Web3(
-            Web3.HTTPProvider(
-                MonadRPC,
-                request_kwargs={
-                    "proxies": {"http": f"http://{proxy}"},
-                    "verify": False,
-                    "timeout": 30,
-                },
-            )
-        )
+        # web3 общий для всех модулей с этим прокси (см. utils.rpc.get_web3)
+        self.web3 = web3
         self.account = Account.from_key(private_key)
+        # nonce выдается локально, менеджер общий для всех модулей Runner'а
+        self.nonce_manager = nonce_manager or NonceManager(web3, self.account.address)
+        self.fee_oracle = get_fee_oracle(web3)
+        self.tx_pipeline = tx_pipeline or TxPipeline()
+        # Балансы аккаунта ведутся локально по квитанциям, ledger общий для всех модулей Runner'а
+        self.ledger = ledger or BalanceLedger(self.account.address)
+        # Паузы между свапами отдают слот планировщика другим аккаунтам
+        self.scheduler = scheduler or Scheduler()
+        self.allowances = allowance_cache
+        self.receipts = get_receipt_tracker(web3)
+        # Лимиты газа по gasUsed прошлых транзакций (общие для всех аккаунтов)
+        self.gas_profiles = gas_profiles
         self.proxy = proxy
-        self.router_contract = self.web3.eth.contract(
-            address=self.web3.to_checksum_address(IZUMI_CONTRACT), abi=IZUMI_ABI
-        )
-        self.config = config
-
-    def get_gas_params(self) -> Dict[str, int]:
-        latest_block = self.web3.eth.get_block("latest")
-        base_fee = latest_block["baseFeePerGas"]
-        max_priority_fee = self.web3.eth.max_priority_fee
-        max_fee = base_fee + max_priority_fee
+        # Контракты и разобранные ABI общие для всех аккаунтов с этим web3
+        self.router_contract = get_contract(self.web3, IZUMI_CONTRACT, IZUMI_ABI)
+        self.config = config or Config()
 
-        gas_params = {
-            "maxFeePerGas": max_fee,
-            "maxPriorityFeePerGas": max_priority_fee,
-        }
-        return gas_params
+    async def get_gas_params(self) -> Dict[str, int]:
+        # Общий для всех модулей и аккаунтов кеш eth_feeHistory
+        return await self.fee_oracle.get_gas_params(self.web3)
 
     def convert_to_wei(self, amount: float, token: str) -> int:
         try:
@@ -74,45 +97,45 @@ class IzumiDex:
             logger.error(f"IzumiDex: Ошибка в convert_from_wei для {token}: {repr(e)}")
             return 0
 
-    def get_tokens_with_balance(self) -> List[Tuple[str, float]]:
+    async def get_tokens_with_balance(self) -> List[Tuple[str, float]]:
         tokens_with_balance = []
 
-        # Проверяем баланс нативного токена (MON)
+        # Native и все токены из ledger'а: из сети (одним вызовом multi-balance контракта) только в первый раз
+        tokens = [token for token in IZUMI_TOKENS if token != "wmon"]  # WMON обрабатывается отдельно
         try:
-            native_balance = self.web3.eth.get_balance(self.account.address)
-            if native_balance > 10**14:  # Больше 0.0001 MON
-                native_amount = float(self.web3.from_wei(native_balance, "ether"))
-                tokens_with_balance.append(("native", native_amount))
+            balances = await self.ledger.balances(
+                self.web3,
+                [ZERO_ADDRESS] + [IZUMI_TOKENS[token]["address"] for token in tokens],
+            )
         except Exception as e:
-            logger.error(f"IzumiDex: Ошибка при получении баланса native: {repr(e)}")
+            logger.error(f"IzumiDex: Ошибка при получении балансов: {repr(e)}")
+            return tokens_with_balance
+
+        # Проверяем баланс нативного токена (MON)
+        native_balance = balances[0]
+        if native_balance > 10**14:  # Больше 0.0001 MON
+            native_amount = float(self.web3.from_wei(native_balance, "ether"))
+            tokens_with_balance.append(("native", native_amount))
 
         # Проверяем балансы остальных токенов
-        for token in IZUMI_TOKENS:
-            if token == "wmon":  # WMON обрабатывается отдельно
-                continue
-            try:
-                token_contract = self.web3.eth.contract(
-                    address=self.web3.to_checksum_address(
-                        IZUMI_TOKENS[token]["address"]
-                    ),
-                    abi=ERC20_ABI,
-                )
-                balance = token_contract.functions.balanceOf(
-                    self.account.address
-                ).call()
-
-                min_amount = 10 ** (IZUMI_TOKENS[token]["decimals"] - 4)
-                if balance >= min_amount:
-                    decimals = IZUMI_TOKENS[token]["decimals"]
-                    amount = float(Decimal(str(balance)) / Decimal(str(10**decimals)))
-                    tokens_with_balance.append((token, amount))
-            except Exception as e:
-                logger.error(f"IzumiDex: Ошибка при получении баланса {token}: {repr(e)}")
-                continue
+        for token, balance in zip(tokens, balances[1:]):
+            min_amount = 10 ** (IZUMI_TOKENS[token]["decimals"] - 4)
+            if balance >= min_amount:
+                decimals = IZUMI_TOKENS[token]["decimals"]
+                amount = float(Decimal(str(balance)) / Decimal(str(10**decimals)))
+                tokens_with_balance.append((token, amount))
 
         return tokens_with_balance
 
-    def approve_token(self, token: str, amount: int) -> Optional[str]:
+    async def approve_token(self, token: str, amount: int, wait: bool = True) -> Union[bool, str, asyncio.Task, None]:
+        """
+        Approve токена для роутера, если текущего allowance не хватает
+
+        Returns:
+            True - allowance уже достаточен, approve не нужен;
+            хеш (при wait=False - asyncio.Task с хешем) - approve отправлен;
+            None - approve не удался, свап этого токена ревертнется
+        """
         try:
             if token not in IZUMI_TOKENS:
                 logger.error(f"IzumiDex: Токен {token} не найден в списке поддерживаемых токенов")
@@ -120,44 +143,54 @@ class IzumiDex:
 
             logger.info(f"IzumiDex: Начинаю approve для токена {token} на сумму {amount}")
 
-            token_contract = self.web3.eth.contract(
-                address=self.web3.to_checksum_address(IZUMI_TOKENS[token]["address"]),
-                abi=ERC20_ABI,
+            # Локальная модель allowance, allowance() читается из сети один раз
+            current_allowance = await self.allowances.get(
+                self.web3, self.account.address, IZUMI_TOKENS[token]["address"], IZUMI_CONTRACT
             )
 
-            current_allowance = token_contract.functions.allowance(
-                self.account.address, IZUMI_CONTRACT
-            ).call()
-
             if current_allowance >= amount:
                 logger.info(f"IzumiDex: Текущий allowance для {token} достаточен ({current_allowance} >= {amount})")
-                return None
-
-            nonce = self.web3.eth.get_transaction_count(self.account.address)
-            gas_params = self.get_gas_params()
-
-            transaction = token_contract.functions.approve(
-                IZUMI_CONTRACT, amount
-            ).build_transaction(
-                {
-                    "from": self.account.address,
-                    "nonce": nonce,
-                    "gas": 100000,
-                    "maxFeePerGas": gas_params["maxFeePerGas"],
-                    "maxPriorityFeePerGas": gas_params["maxPriorityFeePerGas"],
-                }
+                return True
+
+            gas_params = await self.get_gas_params()
+            # При APPROVE_MAX апрув делается один раз на максимальную сумму
+            approve_amount = MAX_UINT256 if APPROVE_MAX else amount
+
+            # Все поля заданы явно: без build_transaction и его eth_chainId (nonce выдается при отправке)
+            transaction = {
+                "from": self.account.address,
+                "to": IZUMI_TOKENS[token]["address"],
+                "data": "0x" + calldata.encode_approve(IZUMI_CONTRACT, approve_amount).hex(),
+                "value": 0,
+                "gas": 100000,
+                "maxFeePerGas": gas_params["maxFeePerGas"],
+                "maxPriorityFeePerGas": gas_params["maxPriorityFeePerGas"],
+                "chainId": await get_chain_id(self.web3),
+            }
+            # Лимит по профилю прошлых approve вместо фиксированных 100000
+            transaction["gas"] = self.gas_profiles.limit(transaction) or transaction["gas"]
+
+            pending = await self.execute_transaction(transaction, wait=wait)
+            self.allowances.track_approve(
+                self.account.address,
+                IZUMI_TOKENS[token]["address"],
+                IZUMI_CONTRACT,
+                approve_amount,
+                pending,
             )
-
-            return self.execute_transaction(transaction)
+            return pending
 
         except Exception as e:
             logger.error(f"IzumiDex: Ошибка при approve токена {token}: {repr(e)}")
             return None
 
-    def execute_transaction(self, tx_data: dict) -> Optional[str]:
+    async def execute_transaction(self, tx_data: dict, wait: bool = True):
+        # wait=False: вернуть asyncio.Task ожидания подтверждения сразу после отправки
         try:
-            current_balance = self.web3.eth.get_balance(self.account.address)
-            gas_price = self.web3.eth.gas_price
+            # Баланс по ledger'у (за вычетом резерва под неподтвержденные транзакции)
+            current_balance = await self.ledger.available_native(self.web3)
+            # Верхняя граница цены газа уже есть в транзакции, отдельный gas_price не нужен
+            gas_price = tx_data.get("maxFeePerGas") or (await self.get_gas_params())["maxFeePerGas"]
             gas_limit = tx_data.get("gas", 21000)
 
             required_balance = gas_price * gas_limit
@@ -170,20 +203,57 @@ class IzumiDex:
                 )
                 return None
 
-            signed_tx = self.web3.eth.account.sign_transaction(tx_data, self.account.key)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            logger.info(f"IzumiDex: Транзакция отправлена: {tx_hash.hex()}")
+            async def sign_and_send(nonce: int):
+                tx_data["nonce"] = nonce
+                # Подпись в пуле процессов, если он запущен (см. utils/signer.py)
+                raw_transaction = await sign_transaction(self.account, tx_data)
+                return await self.web3.eth.send_raw_transaction(raw_transaction)
+
+            async def send():
+                tx_hash = await self.nonce_manager.send(sign_and_send)
+                logger.info(f"IzumiDex: Транзакция отправлена: {tx_hash.hex()}")
+                return tx_hash
 
-            receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            self.ledger.reserve(required_balance)
+            try:
+                pending = await self.tx_pipeline.submit(
+                    send, lambda tx_hash: self.wait_for_receipt(tx_hash, tx_data, required_balance)
+                )
+            except Exception:
+                self.ledger.release(required_balance)
+                raise
+            if not wait:
+                return pending
+            return await pending
+        except Exception as e:
+            logger.error(f"IzumiDex: Ошибка при выполнении транзакции: {repr(e)}")
+            return None
+
+    async def wait_for_receipt(self, tx_hash, tx_data: Optional[dict] = None, reserved: int = 0) -> Optional[str]:
+        try:
+            # Общий трекер блоков вместо опроса по каждой транзакции
+            receipt = await self.receipts.wait(self.web3, tx_hash)
+            if tx_data is not None:
+                # По квитанции обновляются профиль газа этого метода и балансы в ledger'е
+                self.gas_profiles.observe(tx_data, receipt)
+                self.ledger.apply_receipt(receipt, tx_data)
+            if receipt["status"] != 1:
+                # None сбрасывает кеш allowance для approve и не засчитывает транзакцию в журнал
+                logger.error(f"IzumiDex: Транзакция отклонена: {tx_hash.hex()}")
+                return None
             logger.success(f"IzumiDex: Транзакция подтверждена: {tx_hash.hex()}")
             return tx_hash.hex()
         except Exception as e:
-            logger.error(f"IzumiDex: Ошибка при выполнении транзакции: {repr(e)}")
+            # Без квитанции балансы неизвестны - ledger перечитает их из сети
+            self.ledger.invalidate()
+            logger.error(f"IzumiDex: Ошибка при ожидании транзакции {tx_hash.hex()}: {repr(e)}")
             return None
+        finally:
+            self.ledger.release(reserved)
 
-    def swap(self, percentage_to_swap: float = None, type: str = "swap") -> list:
+    async def swap(self, percentage_to_swap: float = None, type: str = "swap") -> list:
         try:
-            tokens_with_balance = self.get_tokens_with_balance()
+            tokens_with_balance = await self.get_tokens_with_balance()
             if not tokens_with_balance:
                 logger.error("IzumiDex: Нет токенов для свапа")
                 return []
@@ -199,40 +269,55 @@ class IzumiDex:
                 ]
                 if not tokens_to_collect:
                     logger.info("IzumiDex: Нет токенов для сбора в native")
-                    return []
+                    return None
                 random.shuffle(tokens_to_collect)
+                if IZUMI_BATCH_COLLECT:
+                    return await self.collect_batched(tokens_to_collect)
                 for token, amount in tokens_to_collect:
                     amount_in = self.convert_to_wei(amount, token)
                     if amount_in == 0:
                         logger.error(f"IzumiDex: Некорректное количество для {token}")
                         continue
                     # Approve если нужно
+                    approve_pending = True
                     if token != "native":
-                        self.approve_token(token, amount_in)
-                        time.sleep(random.randint(2, 5))
+                        approve_pending = await self.approve_token(
+                            token, amount_in, wait=not PIPELINE_TRANSACTIONS
+                        )
+                        if approve_pending is None:
+                            logger.error(f"IzumiDex: Approve {token} не удался, свап пропущен")
+                            continue
+                        if not PIPELINE_TRANSACTIONS:
+                            await self.scheduler.sleep(random.randint(2, 5))
                     # Генерируем swap_data
-                    swap_data = self.generate_swap_data(token, "native", amount_in, 0)
+                    swap_data = await self.generate_swap_data(token, "native", amount_in, 0)
                     if not swap_data:
                         logger.error(f"IzumiDex: Не удалось сгенерировать swap_data для {token}")
                         continue
                     # Собираем multicall
-                    multicall_tx = self.router_contract.functions.multicall(swap_data).build_transaction({
-                        "from": self.account.address,
-                        "nonce": self.web3.eth.get_transaction_count(self.account.address),
-                        **self.get_gas_params(),
-                        "gas": 500000,
-                        "value": 0
-                    })
-                    tx_hash = self.execute_transaction(multicall_tx)
+                    multicall_tx = await self.build_multicall_transaction(swap_data, IZUMI_SWAP_GAS)
+                    # В режиме конвейера approve и свап подтверждаются параллельно
+                    swap_pending = await self.execute_transaction(
+                        multicall_tx, wait=not PIPELINE_TRANSACTIONS
+                    )
+                    _, tx_hash = await confirm_all(approve_pending, swap_pending)
                     if tx_hash:
                         tx_hashes.append(tx_hash)
                         logger.success(f"IzumiDex: Успешно свапнуто {token} в native: {tx_hash}")
-                    time.sleep(random.randint(PAUSE_BETWEEN_SWAPS[0], PAUSE_BETWEEN_SWAPS[1]))
+                        self.allowances.spend(
+                            self.account.address, IZUMI_TOKENS[token]["address"], IZUMI_CONTRACT, amount_in
+                        )
+                    await self.scheduler.sleep(random.randint(PAUSE_BETWEEN_SWAPS[0], PAUSE_BETWEEN_SWAPS[1]))
                 return tx_hashes
             else:
                 num_swaps = random.randint(NUMBER_OF_SWAPS[0], NUMBER_OF_SWAPS[1])
                 logger.info(f"IzumiDex: Количество свапов: {num_swaps}")
-                for _ in range(num_swaps):
+                for i in range(num_swaps):
+                    # Балансы из ledger'а уже учитывают предыдущие свапы, запросов к RPC нет
+                    if i:
+                        tokens_with_balance = await self.get_tokens_with_balance()
+                        if not tokens_with_balance:
+                            break
                     # Выбираем токен для свапа
                     token_in, amount = random.choice(tokens_with_balance)
                     if token_in == "native":
@@ -254,35 +339,44 @@ class IzumiDex:
                         logger.error(f"IzumiDex: Некорректное количество для {token_in}")
                         continue
                     # Approve если нужно
+                    approve_pending = True
                     if token_in != "native":
-                        self.approve_token(token_in, amount_in)
-                        time.sleep(random.randint(2, 5))
+                        approve_pending = await self.approve_token(
+                            token_in, amount_in, wait=not PIPELINE_TRANSACTIONS
+                        )
+                        if approve_pending is None:
+                            logger.error(f"IzumiDex: Approve {token_in} не удался, свап пропущен")
+                            continue
+                        if not PIPELINE_TRANSACTIONS:
+                            await self.scheduler.sleep(random.randint(2, 5))
                     # Генерируем swap_data
-                    swap_data = self.generate_swap_data(token_in, token_out, amount_in, 0)
+                    swap_data = await self.generate_swap_data(token_in, token_out, amount_in, 0)
                     if not swap_data:
                         logger.error(f"IzumiDex: Не удалось сгенерировать swap_data для {token_in}")
                         continue
                     # Собираем multicall
-                    multicall_tx = self.router_contract.functions.multicall(swap_data).build_transaction({
-                        "from": self.account.address,
-                        "nonce": self.web3.eth.get_transaction_count(self.account.address),
-                        **self.get_gas_params(),
-                        "gas": 500000,
-                        "value": 0
-                    })
-                    tx_hash = self.execute_transaction(multicall_tx)
+                    multicall_tx = await self.build_multicall_transaction(swap_data, IZUMI_SWAP_GAS)
+                    # В режиме конвейера approve и свап подтверждаются параллельно
+                    swap_pending = await self.execute_transaction(
+                        multicall_tx, wait=not PIPELINE_TRANSACTIONS
+                    )
+                    _, tx_hash = await confirm_all(approve_pending, swap_pending)
                     if tx_hash:
                         tx_hashes.append(tx_hash)
                         logger.success(f"IzumiDex: Успешно свапнуто {token_in} в {token_out}: {tx_hash}")
-                    time.sleep(random.randint(PAUSE_BETWEEN_SWAPS[0], PAUSE_BETWEEN_SWAPS[1]))
+                        if token_in != "native":
+                            self.allowances.spend(
+                                self.account.address, IZUMI_TOKENS[token_in]["address"], IZUMI_CONTRACT, amount_in
+                            )
+                    await self.scheduler.sleep(random.randint(PAUSE_BETWEEN_SWAPS[0], PAUSE_BETWEEN_SWAPS[1]))
                 return tx_hashes
         except Exception as e:
             logger.error(f"IzumiDex: Ошибка в swap: {repr(e)}")
             return []
 
-    def estimate_gas(self, tx_data: dict) -> int:
+    async def estimate_gas(self, tx_data: dict) -> int:
         try:
-            return self.web3.eth.estimate_gas(tx_data)
+            return await self.web3.eth.estimate_gas(tx_data)
         except Exception as e:
             logger.error(f"IzumiDex: Ошибка при оценке газа: {repr(e)}")
             return 0
@@ -292,42 +386,134 @@ class IzumiDex:
             return IZUMI_TOKENS["wmon"]["address"]
         return IZUMI_TOKENS[token]["address"]
 
-    def generate_swap_data(self, token_in: str, token_out: str, amount_in: int, min_amount_out: int) -> List[dict]:
+    def encode_swap_amount(
+        self, token_in: str, token_out: str, amount_in: int, min_acquired: int, recipient: str
+    ) -> bytes:
+        deadline = int(time.time() + 3600 * 6)  # 6 часов
+
+        # Формируем path с учетом подстановки WMON вместо native
+        path = (
+            bytes.fromhex(self._get_token_address(token_in)[2:]) +
+            bytes.fromhex(self._get_token_address(token_out)[2:])
+        )
+
+        return calldata.encode_swap_amount(path, recipient, amount_in, min_acquired, deadline)
+
+    async def generate_swap_data(self, token_in: str, token_out: str, amount_in: int, min_amount_out: int) -> List[bytes]:
         try:
             data = []
             recipient = self.account.address
-            deadline = int(time.time() + 3600 * 6)  # 6 часов
             min_acquired = min_amount_out  # Обычно 0
 
-            # Формируем path с учетом подстановки WMON вместо native
-            path = (
-                bytes.fromhex(self._get_token_address(token_in)[2:]) +
-                bytes.fromhex(self._get_token_address(token_out)[2:])
-            )
-
-            swap_params = (
-                path,
-                recipient,
-                amount_in,
-                min_acquired,
-                deadline
-            )
-            swap_data = self.router_contract.encode_abi("swapAmount", [swap_params])
+            swap_data = self.encode_swap_amount(token_in, token_out, amount_in, min_acquired, recipient)
             data.append(swap_data)
 
             # Если получаем native (MON), добавляем unwrapWETH9
             if token_out == "native":
-                unwrap_data = self.router_contract.encode_abi(
-                    "unwrapWETH9",
-                    [0, recipient]
-                )
+                unwrap_data = calldata.encode_unwrap_weth9(0, recipient)
                 data.append(unwrap_data)
 
             # Добавляем refundETH всегда
-            refund_data = self.router_contract.encode_abi("refundETH", [])
+            refund_data = calldata.encode_refund_eth()
             data.append(refund_data)
 
             return data
         except Exception as e:
             logger.error(f"IzumiDex: Ошибка при генерации swap_data: {repr(e)}")
-            return [] 
\ No newline at end of file
+            return []
+
+    def generate_collect_data(self, swaps: List[Tuple[str, int]]) -> List[bytes]:
+        """
+        Данные multicall для сбора нескольких токенов в native одной транзакцией
+
+        Args:
+            swaps: Пары (токен, amount_in в wei)
+
+        Returns:
+            List[bytes]: swapAmount для каждого токена, затем один unwrapWETH9 и refundETH
+        """
+        # Нулевой recipient оставляет WMON на роутере, чтобы развернуть его одним unwrapWETH9
+        data = [
+            self.encode_swap_amount(token, "native", amount_in, 0, ZERO_ADDRESS)
+            for token, amount_in in swaps
+        ]
+        data.append(calldata.encode_unwrap_weth9(0, self.account.address))
+        data.append(calldata.encode_refund_eth())
+        return data
+
+    async def build_multicall_transaction(self, calls: List[bytes], gas: int) -> dict:
+        """
+        Транзакция multicall(calls) с теми же полями, что заполняет build_transaction
+
+        Лимит газа берется из профиля прошлых таких multicall, gas - если профиля еще нет.
+        """
+        tx_data = {
+            "from": self.account.address,
+            "to": self.router_contract.address,
+            "data": "0x" + calldata.encode_multicall(calls).hex(),
+            "value": 0,
+            **(await self.get_gas_params()),
+            "chainId": await get_chain_id(self.web3),
+        }
+        tx_data["gas"] = self.gas_profiles.limit(tx_data) or gas
+        return tx_data
+
+    async def collect_batched(self, tokens_to_collect: List[Tuple[str, float]]) -> list:
+        """Сбор всех токенов в native одной multicall транзакцией вместо транзакции на каждый токен"""
+        tokens = [token for token, _ in tokens_to_collect]
+
+        # Точные балансы в wei: после округления float сумма может превысить баланс
+        # и откатить весь multicall
+        balances = await self.ledger.balances(
+            self.web3, [IZUMI_TOKENS[token]["address"] for token in tokens]
+        )
+        swaps = [(token, balance) for token, balance in zip(tokens, balances) if balance > 0]
+        if not swaps:
+            logger.info("IzumiDex: Нет токенов для сбора в native")
+            return None
+
+        logger.info(f"IzumiDex: Сбор {len(swaps)} токенов в native одной транзакцией: {[token for token, _ in swaps]}")
+
+        approvals = []
+        approved_swaps = []
+        for token, amount_in in swaps:
+            approval = await self.approve_token(token, amount_in, wait=not PIPELINE_TRANSACTIONS)
+            if approval is None:
+                # Свап без approve откатил бы весь multicall
+                logger.error(f"IzumiDex: Approve {token} не удался, токен исключен из сбора")
+                continue
+            approvals.append(approval)
+            approved_swaps.append((token, amount_in))
+        swaps = approved_swaps
+        if not swaps:
+            logger.error("IzumiDex: Ни один approve не удался, сбор в native отменен")
+            return []
+        if not PIPELINE_TRANSACTIONS and any(approval is not True for approval in approvals):
+            await self.scheduler.sleep(random.randint(2, 5))
+
+        calls = self.generate_collect_data(swaps)
+        gas_limit = IZUMI_SWAP_GAS * len(swaps)
+        multicall_tx = await self.build_multicall_transaction(calls, gas_limit)
+        profiled = self.gas_profiles.limit(multicall_tx) is not None
+        if not profiled and not any(isinstance(approval, asyncio.Future) for approval in approvals):
+            # Профиля нет, а все approve уже в сети - можно оценить газ точно
+            try:
+                estimate = await self.web3.eth.estimate_gas(
+                    {key: multicall_tx[key] for key in ("from", "to", "data", "value")}
+                )
+                multicall_tx["gas"] = int(estimate * 1.3)
+            except Exception as e:
+                logger.warning(f"IzumiDex: Не удалось оценить газ multicall, лимит {gas_limit}: {repr(e)}")
+        swap_pending = await self.execute_transaction(multicall_tx, wait=not PIPELINE_TRANSACTIONS)
+        *_, tx_hash = await confirm_all(*approvals, swap_pending)
+        if not tx_hash:
+            logger.error("IzumiDex: Не удалось собрать токены в native")
+            return []
+
+        for token, amount_in in swaps:
+            self.allowances.spend(
+                self.account.address, IZUMI_TOKENS[token]["address"], IZUMI_CONTRACT, amount_in
+            )
+        logger.success(f"IzumiDex: Успешно собрано {len(swaps)} токенов в native: {tx_hash}")
+        return [tx_hash]
+
@@ -0,0 +1,151 @@
+import asyncio
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+
+from eth_abi import decode
+from web3 import AsyncWeb3
+
+from general_settings import QUOTE_BATCH_WAIT, QUOTE_BUCKET_DIGITS
+from src.modulse.SwapTasks.constants import BEAN_CONTRACT, BEAN_ABI
+from utils.contracts import get_abi
+from utils.logger import logger
+from utils.rpc_pool import per_rpc
+
+# Котировки скольких последних блоков хранить: узлы пула могут отставать на блок
+QUOTE_BLOCKS = 2
+
+QuoteKey = Tuple[str, str]
+
+
+def amount_bucket(amount: int, digits: int = QUOTE_BUCKET_DIGITS) -> int:
+    """
+    Сумма, округленная вверх до digits значащих цифр
+
+    Близкие суммы котируются одним запросом. Котировка большей суммы
+    пересчитывается на меньшую пропорционально, а проскальзывание пула на
+    большей сумме не меньше, поэтому оценка получается консервативной.
+    """
+    if amount <= 0:
+        return 0
+    step = 10 ** max(0, len(str(amount)) - digits)
+    return -(-amount // step) * step
+
+
+def apply_slippage(amount_out: int, slippage: float) -> int:
+    """Минимум на выходе при допустимом проскальзывании slippage, %"""
+    return int(amount_out * (100 - Decimal(str(slippage))) / 100)
+
+
+def _decode_amounts_out(result: bytes) -> int:
+    return decode(["uint256[]"], result)[0][-1]
+
+
+class QuoteBook:
+    def __init__(self, batch_wait: float = QUOTE_BATCH_WAIT):
+        """
+        Общие котировки свапов для одного RPC
+
+        Запросы котировок от всех аккаунтов копятся batch_wait секунд. Затем
+        одним eth_blockNumber узнается текущий блок, и котировки, которых для
+        этого блока еще нет, запрашиваются одним JSON-RPC batch eth_call на
+        этом блоке. Кеш ключуется номером блока: котировка раздается всем
+        аккаунтам только пока сеть на том же блоке.
+
+        Args:
+            batch_wait (float): Сколько ждать наполнения пачки запросов, секунд
+        """
+        self.batch_wait = batch_wait
+        # Номер блока -> {(to, data): результат}
+        self._quotes: Dict[int, Dict[QuoteKey, int]] = {}
+        self._pending: Dict[QuoteKey, asyncio.Future] = {}
+        self._queue: List[Tuple[QuoteKey, Callable[[bytes], int]]] = []
+        self._queue_web3: Optional[AsyncWeb3] = None
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches = set()
+
+    async def bean_amount_out(self, web3: AsyncWeb3, amount_in: int, path: List[str]) -> int:
+        """Ожидаемый выход getAmountsOut роутера Bean для amount_in по path"""
+        bucket = amount_bucket(amount_in)
+        data = get_abi(BEAN_ABI).encode("getAmountsOut", [bucket, path])
+        quoted = await self.quote(web3, BEAN_CONTRACT, data, _decode_amounts_out)
+        return quoted * amount_in // bucket
+
+    async def quote(self, web3: AsyncWeb3, to: str, data: str, decoder: Callable[[bytes], int]) -> int:
+        """Результат eth_call(to, data) на текущем блоке: из кеша блока или из следующей пачки"""
+        key = (to, data)
+        loop = asyncio.get_running_loop()
+        future = self._pending.get(key)
+        if future is None or future.get_loop() is not loop:
+            future = loop.create_future()
+            self._pending[key] = future
+            self._queue.append((key, decoder))
+            self._queue_web3 = web3
+            if self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_wait, self._flush)
+        # Отмена одного ожидающего не должна отменять котировку для остальных
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        self._flush_handle = None
+        batch, self._queue = self._queue, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._fetch(self._queue_web3, batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _fetch(self, web3: AsyncWeb3, batch: List[Tuple[QuoteKey, Callable[[bytes], int]]]):
+        try:
+            block = await web3.eth.block_number
+        except Exception as e:
+            logger.warning(f"QuoteBook: Ошибка при получении номера блока: {repr(e)}")
+            for key, _ in batch:
+                self._settle(key, error=e)
+            return
+
+        cached = self._quotes.get(block, {})
+        missing = []
+        for key, decoder in batch:
+            if key in cached:
+                self._settle(key, result=cached[key])
+            else:
+                missing.append((key, decoder))
+        if not missing:
+            return
+
+        requests = [("eth_call", [{"to": to, "data": data}, hex(block)]) for (to, data), _ in missing]
+        try:
+            responses = await web3.provider.batch_request(requests)
+        except Exception as e:
+            logger.warning(f"QuoteBook: Ошибка при получении котировок: {repr(e)}")
+            for key, _ in missing:
+                self._settle(key, error=e)
+            return
+
+        quotes = self._quotes.setdefault(block, {})
+        for number in [number for number in self._quotes if number <= block - QUOTE_BLOCKS]:
+            del self._quotes[number]
+
+        for (key, decoder), response in zip(missing, responses):
+            try:
+                if "error" in response:
+                    raise ValueError(response["error"])
+                amount_out = decoder(bytes.fromhex(response["result"][2:]))
+            except Exception as e:
+                self._settle(key, error=e)
+                continue
+            quotes[key] = amount_out
+            self._settle(key, result=amount_out)
+
+    def _settle(self, key: QuoteKey, result: int = None, error: Exception = None):
+        future = self._pending.pop(key, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+# Общий QuoteBook на RPC: котировки одного блока раздаются всем аккаунтам
+get_quote_book = per_rpc(QuoteBook)
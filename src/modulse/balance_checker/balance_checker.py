@@ -1,13 +1,66 @@
-from decimal import Decimal
-from typing import Dict, List, Optional
-from web3 import Web3
+import asyncio
+import random
+from typing import List, Optional, Sequence
+from web3 import AsyncWeb3, Web3
 from web3.exceptions import ContractLogicError
 from tabulate import tabulate
 from loguru import logger
 from eth_account import Account
 
-from utils.networks import MonadRPC
-from .constants import CONTRACT_ADDRESS, CONTRACT_ABI, TOKENS
+from general_settings import (
+    BALANCE_CHUNK_SIZE,
+    BALANCE_CONCURRENCY,
+    BALANCE_CHUNK_RETRIES,
+    BALANCE_TOP_N,
+    SLEEP_TIME_RETRY,
+)
+from utils.multi_balance import get_multi_balances
+from utils.rpc import get_web3
+from .balance_table import BalanceTable
+from .constants import TOKENS
+from .sinks import BalanceSink
+
+
+def format_summary(results: BalanceTable, top_n: int = BALANCE_TOP_N, sort_by: str = "mon") -> str:
+    """
+    Сводка по балансам для консоли и Telegram
+
+    Если кошельков не больше top_n, выводятся все строки по порядку,
+    иначе - top_n кошельков с наибольшим балансом sort_by. Итоги по токенам
+    выводятся всегда.
+
+    Args:
+        results (BalanceTable): Матрица балансов
+        top_n (int): Сколько кошельков выводить
+        sort_by (str): Токен для выбора top_n
+
+    Returns:
+        str: Текст сводки
+    """
+    headers = ["№", "Wallet"] + results.tokens
+
+    if len(results) <= top_n:
+        title = "Балансы токенов:"
+        indices = range(len(results))
+    else:
+        title = f"Топ-{top_n} из {len(results)} кошельков по балансу {sort_by}:"
+        indices = results.top(top_n, sort_by)
+
+    # Форматируются только выводимые строки
+    table_data = []
+    for i in indices:
+        row = results.row(i)
+        table_data.append([row["index"], row["wallet"]] + [row[token] for token in results.tokens])
+
+    totals = results.totals()
+    totals_data = [[token, f"{totals[token]:.4f}"] for token in results.tokens]
+
+    return (
+        f"\n{title}\n"
+        + tabulate(table_data, headers=headers, tablefmt="grid")
+        + f"\n\nИтого по {len(results)} кошелькам:\n"
+        + tabulate(totals_data, headers=["Token", "Total"], tablefmt="simple", disable_numparse=True)
+    )
 
 
 class BalanceChecker:
@@ -23,33 +76,56 @@ class BalanceChecker:
         self.proxy = proxy
         self.account = Account.from_key(private_key)
 
-        # Инициализация Web3 и контракта
-        self.web3 = Web3(
-            Web3.HTTPProvider(
-                MonadRPC,
-                request_kwargs={
-                    "proxies": {"http": f"http://{self.proxy}"} if self.proxy else None,
-                    "verify": False,
-                },
-            )
-        )
-
-        if not self.web3.is_connected():
+        # Web3 (общий пул соединений на прокси) создается в connect()
+        self.web3: Optional[AsyncWeb3] = None
+
+    async def connect(self):
+        """Подключение к Monad RPC через общий пул соединений"""
+        self.web3 = await get_web3(self.proxy)
+
+        if not await self.web3.is_connected():
             raise ConnectionError("Не удалось подключиться к Monad RPC")
 
-        self.contract = self.web3.eth.contract(
-            address=Web3.to_checksum_address(CONTRACT_ADDRESS), abi=CONTRACT_ABI
-        )
+    async def get_chunk_balances(
+        self, wallet_addresses: List[str], token_addresses: List[str]
+    ) -> List[int]:
+        """
+        Балансы одной пачки кошельков с повторами при ошибках
+
+        Args:
+            wallet_addresses (List[str]): Кошельки пачки
+            token_addresses (List[str]): Адреса токенов
 
-    def get_balances(self, wallets: List[str]) -> List[Dict]:
+        Returns:
+            List[int]: Плоский список балансов, как у balances()
+        """
+        for attempt in range(1, BALANCE_CHUNK_RETRIES + 1):
+            try:
+                return await get_multi_balances(
+                    self.web3, wallet_addresses, token_addresses
+                )
+            except Exception as e:
+                if attempt == BALANCE_CHUNK_RETRIES:
+                    raise
+                sleep_time = random.randint(SLEEP_TIME_RETRY[0], SLEEP_TIME_RETRY[1])
+                logger.warning(
+                    f"Ошибка при получении балансов пачки из {len(wallet_addresses)} кошельков "
+                    f"(попытка {attempt}/{BALANCE_CHUNK_RETRIES}), повтор через {sleep_time} сек.: {e}"
+                )
+                await asyncio.sleep(sleep_time)
+
+    async def get_balances(
+        self, wallets: List[str], sinks: Sequence[BalanceSink] = ()
+    ) -> BalanceTable:
         """
         Получение балансов для списка кошельков
 
         Args:
             wallets (List[str]): Список адресов кошельков
+            sinks (Sequence[BalanceSink]): Приемники, получают пачки по мере готовности
 
         Returns:
-            List[Dict]: Список словарей с балансами
+            BalanceTable: Матрица балансов кошельки × токены
         """
         try:
             # Подготовка данных
@@ -59,33 +135,40 @@ class BalanceChecker:
                 for token in TOKENS.keys()
             ]
 
-            # Получение балансов через контракт
-            balances = self.contract.functions.balances(
-                wallet_addresses, token_addresses
-            ).call()
-
-            # Обработка результатов
-            results = []
-            tokens_count = len(TOKENS)
-
-            for i, wallet in enumerate(wallet_addresses):
-                wallet_balances = {"wallet": wallet, "index": i + 1}
-
-                # Получаем балансы для текущего кошелька
-                wallet_balances_list = balances[
-                    i * tokens_count : (i + 1) * tokens_count
-                ]
-
-                for j, token in enumerate(TOKENS.keys()):
-                    balance = Decimal(wallet_balances_list[j]) / Decimal(
-                        10 ** TOKENS[token]["decimals"]
-                    )
-                    # Используем фиксированное количество знаков после запятой (4)
-                    wallet_balances[token] = f"{float(balance):.4f}"
-
-                results.append(wallet_balances)
-
-            return results
+            # Кошельки делятся на пачки по BALANCE_CHUNK_SIZE, пачки запрашиваются
+            # параллельно (не больше BALANCE_CONCURRENCY одновременно)
+            chunks = [
+                wallet_addresses[i : i + BALANCE_CHUNK_SIZE]
+                for i in range(0, len(wallet_addresses), BALANCE_CHUNK_SIZE)
+            ]
+            semaphore = asyncio.Semaphore(BALANCE_CONCURRENCY)
+
+            async def fetch_chunk(chunk: List[str]) -> List[int]:
+                async with semaphore:
+                    return await self.get_chunk_balances(chunk, token_addresses)
+
+            tokens = list(TOKENS.keys())
+            decimals = [TOKENS[token]["decimals"] for token in tokens]
+
+            # Пачки запрашиваются параллельно, а отдаются в приемники строго по порядку:
+            # пачка i записывается, как только готовы она и все предыдущие
+            tasks = [asyncio.ensure_future(fetch_chunk(chunk)) for chunk in chunks]
+            tables = []
+            try:
+                offset = 0
+                for chunk, task in zip(chunks, tasks):
+                    table = BalanceTable.from_flat(chunk, tokens, decimals, await task, offset)
+                    for sink in sinks:
+                        sink.write(table)
+                    tables.append(table)
+                    offset += len(chunk)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+            if not tables:
+                return BalanceTable.from_flat([], tokens, decimals, [])
+            return BalanceTable.concat(tables)
 
         except ContractLogicError as e:
             logger.error(f"Ошибка контракта при получении балансов: {e}")
@@ -94,50 +177,55 @@ class BalanceChecker:
             logger.error(f"Ошибка при получении балансов: {e}")
             raise
 
-    def display_balances(self, results: List[Dict]):
+    def display_balances(self, results: BalanceTable):
         """
         Отображение результатов в виде таблицы
 
         Args:
-            results (List[Dict]): Список словарей с балансами
+            results (BalanceTable): Матрица балансов
         """
         try:
-            # Подготовка заголовков
-            headers = ["№", "Wallet"] + list(TOKENS.keys())
-
-            # Подготовка данных
-            table_data = []
-            for result in results:
-                row = [result["index"], result["wallet"]]
-                for token in TOKENS.keys():
-                    row.append(result[token])
-                table_data.append(row)
-
-            # Вывод таблицы
-            print("\nБалансы токенов:")
-            print(tabulate(table_data, headers=headers, tablefmt="grid"))
+            print(format_summary(results))
 
         except Exception as e:
             logger.error(f"Ошибка при отображении балансов: {e}")
             raise
 
-    async def run(self, wallets: List[str]):
+    async def run(
+        self, wallets: List[str], sinks: Sequence[BalanceSink] = (), display: bool = True
+    ) -> BalanceTable:
         """
         Основной метод для проверки балансов
 
         Args:
             wallets (List[str]): Список адресов кошельков
+            sinks (Sequence[BalanceSink]): Приемники для выгрузки балансов в файл
+            display (bool): Вывести сводку в консоль
+
+        Returns:
+            BalanceTable: Матрица балансов
         """
         try:
             logger.info("Начало проверки балансов")
 
+            if self.web3 is None:
+                await self.connect()
+
             # Получение балансов
-            results = self.get_balances(wallets)
+            for sink in sinks:
+                sink.open(list(TOKENS.keys()))
+            try:
+                results = await self.get_balances(wallets, sinks)
+            finally:
+                for sink in sinks:
+                    sink.close()
 
             # Отображение результатов
-            self.display_balances(results)
+            if display:
+                self.display_balances(results)
 
             logger.success("Проверка балансов завершена")
+            return results
 
         except Exception as e:
             logger.error(f"Ошибка при выполнении проверки балансов: {e}")
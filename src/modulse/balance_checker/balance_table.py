@@ -0,0 +1,114 @@
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+class BalanceTable:
+    def __init__(
+        self,
+        wallets: List[str],
+        tokens: List[str],
+        decimals: List[int],
+        wei: np.ndarray,
+        start_index: int = 0,
+    ):
+        """
+        Балансы в виде матрицы кошельки × токены
+
+        Хранит точные значения в wei (uint256 не помещается в int64, поэтому
+        dtype=object с обычными int), пересчет в токены делается одной
+        векторной операцией, а строки форматируются только при выводе.
+
+        Args:
+            wallets (List[str]): Адреса кошельков (строки матрицы)
+            tokens (List[str]): Названия токенов (столбцы матрицы)
+            decimals (List[int]): decimals для каждого токена
+            wei (np.ndarray): Матрица балансов в wei, shape = (len(wallets), len(tokens))
+            start_index (int): Номер первого кошелька в общем списке (для пачек)
+        """
+        self.wallets = wallets
+        self.tokens = tokens
+        self.decimals = np.asarray(decimals, dtype=np.int64)
+        self.wei = wei
+        self.start_index = start_index
+        self._amounts: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_flat(
+        cls,
+        wallets: List[str],
+        tokens: List[str],
+        decimals: List[int],
+        balances: List[int],
+        start_index: int = 0,
+    ) -> "BalanceTable":
+        """Строит таблицу из плоского ответа balances() (построчно: кошелек по всем токенам)"""
+        wei = np.array(balances, dtype=object).reshape(len(wallets), len(tokens))
+        return cls(wallets, tokens, decimals, wei, start_index)
+
+    @classmethod
+    def concat(cls, tables: List["BalanceTable"]) -> "BalanceTable":
+        """Склеивает пачки в одну таблицу (пачки идут подряд)"""
+        first = tables[0]
+        wallets = [wallet for table in tables for wallet in table.wallets]
+        wei = np.vstack([table.wei for table in tables])
+        return cls(wallets, first.tokens, list(first.decimals), wei, first.start_index)
+
+    def __len__(self) -> int:
+        return len(self.wallets)
+
+    @property
+    def amounts(self) -> np.ndarray:
+        """Балансы в токенах (float64), считаются один раз для всей матрицы"""
+        if self._amounts is None:
+            scale = np.power(10.0, self.decimals)
+            self._amounts = self.wei.astype(np.float64) / scale
+        return self._amounts
+
+    def column(self, token: str) -> np.ndarray:
+        """Балансы одного токена по всем кошелькам, в токенах"""
+        return self.amounts[:, self.tokens.index(token)]
+
+    def totals(self) -> Dict[str, Decimal]:
+        """Сумма по каждому токену, точно (суммируются wei)"""
+        totals_wei = self.wei.sum(axis=0) if len(self) else [0] * len(self.tokens)
+        return {
+            token: Decimal(int(total)) / Decimal(10 ** int(decimals))
+            for token, total, decimals in zip(self.tokens, totals_wei, self.decimals)
+        }
+
+    def top(self, n: int, token: str) -> List[int]:
+        """Номера строк n кошельков с наибольшим балансом token, по убыванию"""
+        column = self.column(token)
+        n = min(n, len(column))
+        if n <= 0:
+            return []
+        # argpartition выбирает n наибольших за O(N), сортируются только они
+        indices = np.argpartition(-column, n - 1)[:n]
+        return indices[np.argsort(-column[indices], kind="stable")].tolist()
+
+    def row(self, i: int) -> Dict:
+        """
+        Строка i в прежнем формате get_balances
+
+        Returns:
+            Dict: {"wallet", "index", <token>: "0.0000", ...}
+        """
+        result = {"wallet": self.wallets[i], "index": self.start_index + i + 1}
+        for token, amount in zip(self.tokens, self.amounts[i]):
+            result[token] = f"{amount:.4f}"
+        return result
+
+    def wei_rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Строки [start, stop) для выгрузки: точные балансы в wei
+
+        Returns:
+            Iterator[Dict]: {"index", "wallet", <token>: int, ...}
+        """
+        for i in range(*slice(start, stop).indices(len(self))):
+            result = {"index": self.start_index + i + 1, "wallet": self.wallets[i]}
+            for token, wei in zip(self.tokens, self.wei[i]):
+                result[token] = int(wei)
+            yield result
@@ -1,6 +1,3 @@
-CONTRACT_ADDRESS = "0xe1bEECa48cA52f9475A27891844022d4C49FFde1"
-CONTRACT_ABI = [{"constant":True,"inputs":[{"name":"user","type":"address"},{"name":"token","type":"address"}],"name":"tokenBalance","outputs":[{"name":"","type":"uint256"}],"payable":False,"stateMutability":"view","type":"function"},{"constant":True,"inputs":[{"name":"users","type":"address[]"},{"name":"tokens","type":"address[]"}],"name":"balances","outputs":[{"name":"","type":"uint256[]"}],"payable":False,"stateMutability":"view","type":"function"},{"payable":True,"stateMutability":"payable","type":"fallback"}]
-
 TOKENS = {
     "mon": {
         "address": "0x0000000000000000000000000000000000000000",
@@ -0,0 +1,145 @@
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from typing import List, Optional
+
+from .balance_table import BalanceTable
+
+
+class BalanceSink(ABC):
+    """
+    Приемник результатов BalanceChecker
+
+    Пачки балансов передаются в write() по мере получения, в порядке кошельков,
+    поэтому файл пишется потоково и весь результат не нужно держать в памяти.
+    Все форматы выгружают точные балансы целыми числами в wei (см.
+    BalanceTable.wei_rows), округление до 4 знаков - только в консоли и Telegram.
+    """
+
+    def open(self, tokens: List[str]):
+        """Вызывается один раз до первой пачки"""
+
+    @abstractmethod
+    def write(self, table: BalanceTable):
+        """Записывает очередную пачку"""
+
+    def close(self):
+        """Вызывается после последней пачки, в том числе при ошибке"""
+
+
+class CsvSink(BalanceSink):
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._writer = None
+
+    def open(self, tokens: List[str]):
+        self._file = open(self.path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=["index", "wallet"] + tokens)
+        self._writer.writeheader()
+
+    def write(self, table: BalanceTable):
+        self._writer.writerows(table.wei_rows())
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JsonlSink(BalanceSink):
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def open(self, tokens: List[str]):
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def write(self, table: BalanceTable):
+        self._file.writelines(json.dumps(row) + "\n" for row in table.wei_rows())
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetSink(BalanceSink):
+    def __init__(self, path: str):
+        """
+        Запись в Parquet, одна пачка - одна row group
+
+        Балансы пишутся в wei как decimal256(76, 0): uint256 не помещается
+        в int64, а float64 теряет точность (балансы от 10**76 wei бывают
+        только у тестовых токенов и в decimal256 не помещаются - для них csv / jsonl). Нужен pyarrow.
+        """
+        self.path = path
+        self._writer = None
+        self._schema = None
+
+    def open(self, tokens: List[str]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Для записи балансов в Parquet установите pyarrow: pip install pyarrow")
+
+        self._pa = pa
+        self._schema = pa.schema(
+            [("index", pa.int64()), ("wallet", pa.string())]
+            + [(token, pa.decimal256(76, 0)) for token in tokens]
+        )
+        self._writer = pq.ParquetWriter(self.path, self._schema)
+
+    def write(self, table: BalanceTable):
+        start = table.start_index + 1
+        columns = [
+            list(range(start, start + len(table))),
+            table.wallets,
+        ] + [
+            self._pa.array([Decimal(int(wei)) for wei in table.wei[:, j]], type=self._pa.decimal256(76, 0))
+            for j in range(len(table.tokens))
+        ]
+        self._writer.write_table(self._pa.Table.from_arrays(columns, schema=self._schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+SINKS = {
+    "csv": CsvSink,
+    "jsonl": JsonlSink,
+    "parquet": ParquetSink,
+}
+
+
+def make_sink(export_format: str, path: str) -> Optional[BalanceSink]:
+    """
+    Создает приемник по формату из настроек
+
+    Args:
+        export_format (str): "csv" / "jsonl" / "parquet", пустая строка - без выгрузки
+        path (str): Путь к файлу без расширения
+
+    Returns:
+        Optional[BalanceSink]: Приемник или None, если выгрузка выключена
+    """
+    if not export_format:
+        return None
+
+    export_format = export_format.lower()
+    if export_format not in SINKS:
+        raise ValueError(
+            f"Неизвестный формат выгрузки балансов: {export_format} (доступны: {', '.join(SINKS)})"
+        )
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return SINKS[export_format](f"{path}.{export_format}")
@@ -1,10 +1,20 @@
-from general_settings import TASKS, SLEEP_TIME_MODULES
+from general_settings import TASKS, SLEEP_MODE, SLEEP_TIME_MODULES
 from src.modulse.SwapTasks.bean_dex import BeanDex
-from src.modulse.test2.test2 import Test2
 from utils.config import Config
 from utils.logger import logger
+from utils.rpc import get_web3
+from utils.nonce_manager import NonceManager
+from utils.tx_pipeline import TxPipeline
+from utils.balance_ledger import BalanceLedger
+from utils.scheduler import Scheduler
+from utils.journal import RunJournal, STARTED, DONE, FAILED, TX_CONFIRMED, TX_DROPPED
+from utils.receipt_tracker import get_receipt_tracker
+from eth_account import Account
+from web3 import AsyncWeb3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from typing import Optional, Tuple
+import asyncio
 import random
-import time
 from src.modulse.SwapTasks.izumi_dex import IzumiDex
 
 
@@ -15,11 +25,16 @@ class Runner:
         proxy: str,
         private_key: str,
         config: Config,
+        journal: Optional[RunJournal] = None,
+        scheduler: Optional[Scheduler] = None,
     ):
         self.account_name = account_name
         self.proxy = proxy
         self.private_key = private_key
         self.config = config
+        self.journal = journal
+        # Паузы между заданиями и свапами не занимают слот планировщика Process
+        self.scheduler = scheduler or Scheduler()
 
     def check_tasks(self) -> bool:
         if not TASKS:
@@ -29,81 +44,213 @@ class Runner:
         logger.info(f"Аккаунт {self.account_name}: Найдено {len(TASKS)} заданий")
         return True
 
-    def execute_tasks(self):
+    @staticmethod
+    def count_transactions(result) -> int:
+        """Количество успешных транзакций в результате swap() (список хешей или None)"""
+        return len(result) if isinstance(result, list) else 0
+
+    @staticmethod
+    def task_succeeded(result) -> bool:
+        """
+        Задание выполнено: swap() отправил хотя бы одну успешную транзакцию
+        или вернул None - делать было нечего (например, нет токенов для сбора).
+        Пустой список - ни одна транзакция не прошла.
+        """
+        return result is None or bool(result)
+
+    @staticmethod
+    def task_keys(tasks: list) -> list:
+        """Пары (задание, ключ в журнале): одинаковые задания в TASKS различаются номером"""
+        seen = {}
+        keys = []
+        for task in tasks:
+            seen[task] = seen.get(task, 0) + 1
+            keys.append((task, f"{task}#{seen[task]}"))
+        return keys
+
+    async def reattach_transactions(self, web3: AsyncWeb3) -> int:
+        """
+        Дожидается транзакций, отправленных до прерывания запуска
+
+        Returns:
+            int: Количество подтвержденных из них
+        """
+        pending = self.journal.pending_transactions(self.account_name)
+        if not pending:
+            return 0
+
+        logger.info(
+            f"Аккаунт {self.account_name}: Ожидание {len(pending)} транзакций из прерванного запуска"
+        )
+        tracker = get_receipt_tracker(web3)
+
+        async def follow(task: str, tx_hash: str) -> bool:
+            try:
+                # Транзакция могла попасть в блок задолго до перезапуска - сначала прямой запрос
+                try:
+                    receipt = await web3.eth.get_transaction_receipt(tx_hash)
+                except TransactionNotFound:
+                    receipt = await tracker.wait(web3, tx_hash)
+                state = TX_CONFIRMED if receipt["status"] == 1 else FAILED
+            except TimeExhausted:
+                state = TX_DROPPED
+            self.journal.record(self.account_name, "tx", state, task, tx_hash)
+            return state == TX_CONFIRMED
+
+        results = await asyncio.gather(*(follow(task, tx_hash) for task, tx_hash in pending))
+        return sum(results)
+
+    async def execute_tasks(self) -> Tuple[int, int]:
+        """
+        Выполняет задания аккаунта
+
+        Returns:
+            Tuple[int, int]: Количество успешных транзакций и количество невыполненных заданий
+        """
+        tx_count = 0
+        failed_tasks = 0
 
         if not self.check_tasks():
-            return
+            return tx_count, failed_tasks
+
+        # Один пул соединений на прокси для всех заданий аккаунта
+        web3 = await get_web3(self.proxy)
+        # Общий nonce для всех модулей аккаунта
+        nonce_manager = NonceManager(web3, Account.from_key(self.private_key).address)
+        # Лимит неподтвержденных транзакций аккаунта (MAX_TX_IN_FLIGHT)
+        tx_pipeline = TxPipeline()
+        # Общие для всех модулей балансы аккаунта, обновляются по квитанциям
+        ledger = BalanceLedger(Account.from_key(self.private_key).address)
 
         # Создаем копию списка заданий и перемешиваем
-        tasks = TASKS.copy()
+        tasks = self.task_keys(TASKS)
+        if self.journal is not None:
+            self.journal.record(self.account_name, "account", STARTED)
+            tx_count += await self.reattach_transactions(web3)
+            # При продолжении прерванного запуска выполненные задания пропускаются
+            done_tasks = self.journal.done_tasks(self.account_name)
+            if done_tasks:
+                logger.info(
+                    f"Аккаунт {self.account_name}: Пропуск уже выполненных заданий: {sorted(done_tasks)}"
+                )
+            tasks = [(task, task_key) for task, task_key in tasks if task_key not in done_tasks]
         random.shuffle(tasks)
 
-        for task in tasks:
+        for task, task_key in tasks:
             try:
                 logger.info(
                     f"Аккаунт {self.account_name}: Начало выполнения задания {task}"
                 )
+                if self.journal is not None:
+                    self.journal.record(self.account_name, "task", STARTED, task_key)
+                    tx_pipeline.journal = self.journal.tx_recorder(self.account_name, task_key)
 
                 # Создаем экземпляр соответствующего класса
                 if task == "BeanDex":
                     module = BeanDex(
                         private_key=self.private_key,
+                        web3=web3,
                         proxy=self.proxy,
                         config=self.config,
+                        nonce_manager=nonce_manager,
+                        tx_pipeline=tx_pipeline,
+                        ledger=ledger,
+                        scheduler=self.scheduler,
                     )
-                    swap_balance = module.swap(type="swap")
+                    result = await module.swap(type="swap")
                     logger.info(
-                        f"Аккаунт {self.account_name}: Свапы в задании {task}: {swap_balance}"
+                        f"Аккаунт {self.account_name}: Свапы в задании {task}: {result}"
                     )
                 elif task == "IzumiDex":
                     module = IzumiDex(
                         private_key=self.private_key,
+                        web3=web3,
                         proxy=self.proxy,
                         config=self.config,
+                        nonce_manager=nonce_manager,
+                        tx_pipeline=tx_pipeline,
+                        ledger=ledger,
+                        scheduler=self.scheduler,
                     )
-                    swap_balance = module.swap(type="swap")
+                    result = await module.swap(type="swap")
                     logger.info(
-                        f"Аккаунт {self.account_name}: Свапы в задании {task}: {swap_balance}"
+                        f"Аккаунт {self.account_name}: Свапы в задании {task}: {result}"
                     )
                 elif task == "collect_bean":
                     module = BeanDex(
                         private_key=self.private_key,
+                        web3=web3,
                         proxy=self.proxy,
                         config=self.config,
+                        nonce_manager=nonce_manager,
+                        tx_pipeline=tx_pipeline,
+                        ledger=ledger,
+                        scheduler=self.scheduler,
                     )
-                    collect_balance = module.swap(percentage_to_swap=99, type="collect")
+                    result = await module.swap(percentage_to_swap=99, type="collect")
                     logger.info(
-                        f"Аккаунт {self.account_name}: Баланс MON в задании {task}: {collect_balance}"
+                        f"Аккаунт {self.account_name}: Баланс MON в задании {task}: {result}"
                     )
                 elif task == "collect_izumi":
                     module = IzumiDex(
                         private_key=self.private_key,
+                        web3=web3,
                         proxy=self.proxy,
                         config=self.config,
+                        nonce_manager=nonce_manager,
+                        tx_pipeline=tx_pipeline,
+                        ledger=ledger,
+                        scheduler=self.scheduler,
                     )
-                    collect_balance = module.swap(percentage_to_swap=99, type="collect")
+                    result = await module.swap(percentage_to_swap=99, type="collect")
                     logger.info(
-                        f"Аккаунт {self.account_name}: Баланс MON в задании {task}: {collect_balance}"
+                        f"Аккаунт {self.account_name}: Баланс MON в задании {task}: {result}"
                     )
                 else:
                     logger.error(f"Аккаунт {self.account_name}: Задание '{task}' не найдено. Проверьте general_settings.TASKS.")
+                    failed_tasks += 1
+                    continue
+
+                tx_count += self.count_transactions(result)
+                if not self.task_succeeded(result):
+                    logger.error(
+                        f"Аккаунт {self.account_name}: Задание {task} не выполнено: ни одна транзакция не прошла"
+                    )
+                    failed_tasks += 1
+                    if self.journal is not None:
+                        # При продолжении запуска задание выполнится снова
+                        self.journal.record(self.account_name, "task", FAILED, task_key)
                     continue
                 logger.success(
                     f"Аккаунт {self.account_name}: Задание {task} успешно выполнено"
                 )
+                if self.journal is not None:
+                    # Свапы задания уже подтверждены или отклонены: swap() ждет их перед возвратом
+                    self.journal.record(self.account_name, "task", DONE, task_key)
 
-                # Случайная задержка между заданиями
-                if task != tasks[-1]:  # Если это не последнее задание
+                # Случайная задержка между заданиями (при SLEEP_MODE)
+                if SLEEP_MODE and task_key != tasks[-1][1]:  # Если это не последнее задание
                     sleep_time = random.randint(
                         SLEEP_TIME_MODULES[0], SLEEP_TIME_MODULES[1]
                     )
                     logger.info(
                         f"Аккаунт {self.account_name}: Ожидание {sleep_time} секунд перед следующим заданием"
                     )
-                    time.sleep(sleep_time)
+                    await self.scheduler.sleep(sleep_time)
 
             except Exception as e:
                 logger.error(
                     f"Аккаунт {self.account_name}: Ошибка при выполнении задания {task}: {repr(e)}"
                 )
+                failed_tasks += 1
+                if self.journal is not None:
+                    self.journal.record(self.account_name, "task", FAILED, task_key)
                 continue
+            finally:
+                # Задание завершено только когда все его транзакции подтверждены
+                await tx_pipeline.drain()
+
+        # Аккаунт с упавшими заданиями при продолжении запуска обрабатывается снова (только эти задания)
+        if self.journal is not None and not failed_tasks:
+            self.journal.record(self.account_name, "account", DONE)
+        return tx_count, failed_tasks
@@ -0,0 +1,9 @@
+import json
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def load_abi(path: str) -> list:
+    """ABI из json файла, читается и разбирается один раз за процесс"""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
@@ -0,0 +1,105 @@
+import base64
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+SNAPSHOT_VERSION = 1
+KDF_ITERATIONS = 200_000
+
+
+def snapshot_path(source_path: str) -> str:
+    """Снимок лежит рядом с Excel файлом: ./data/.account_data.xlsx.cache"""
+    directory, name = os.path.split(source_path)
+    return os.path.join(directory, f".{name}.cache")
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fernet(password: str, salt: bytes) -> Fernet:
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=KDF_ITERATIONS)
+    return Fernet(base64.urlsafe_b64encode(kdf.derive(password.encode())))
+
+
+def load_snapshot(source_path: str, password: Optional[str]) -> Optional[Dict]:
+    """
+    Читает снимок данных аккаунтов, если он актуален
+
+    Снимок считается актуальным, если у Excel файла не изменились mtime и размер,
+    либо (после копирования, touch и т.п.) совпадает sha256 содержимого.
+
+    Args:
+        source_path (str): Путь к Excel файлу
+        password (Optional[str]): Пароль Excel файла, им же зашифрован снимок
+
+    Returns:
+        Optional[Dict]: Данные аккаунтов или None, если пароля нет, снимка нет,
+            он устарел или не расшифровывается этим паролем
+    """
+    if not password:
+        return None
+    path = snapshot_path(source_path)
+    try:
+        with open(path, "rb") as file:
+            header = json.loads(file.readline())
+            payload = file.read()
+    except (OSError, ValueError):
+        return None
+
+    if header.get("version") != SNAPSHOT_VERSION:
+        return None
+
+    stat = os.stat(source_path)
+    if (header.get("mtime_ns"), header.get("size")) != (stat.st_mtime_ns, stat.st_size):
+        if header.get("sha256") != file_sha256(source_path):
+            return None
+
+    try:
+        payload = _fernet(password, base64.b64decode(header["salt"])).decrypt(payload)
+    except (InvalidToken, KeyError, ValueError):
+        return None
+
+    try:
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def save_snapshot(source_path: str, password: str, data: Dict):
+    """
+    Сохраняет зашифрованный снимок данных аккаунтов рядом с Excel файлом
+
+    Снимок шифруется паролем Excel файла (Fernet, ключ из пароля через PBKDF2).
+    Без пароля снимок не пишется: в нем приватные ключи.
+    """
+    if not password:
+        raise ValueError("Снимок аккаунтов сохраняется только зашифрованным, нужен пароль")
+    stat = os.stat(source_path)
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": file_sha256(source_path),
+    }
+
+    salt = os.urandom(16)
+    header["salt"] = base64.b64encode(salt).decode()
+    payload = _fernet(password, salt).encrypt(json.dumps(data).encode())
+
+    # Запись через временный файл, чтобы прерванный запуск не оставил битый снимок
+    path = snapshot_path(source_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(json.dumps(header).encode() + b"\n")
+        file.write(payload)
+    os.replace(tmp_path, path)
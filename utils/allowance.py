@@ -0,0 +1,75 @@
+import asyncio
+from typing import Dict, Tuple
+
+from web3 import AsyncWeb3
+
+from utils.constants import ERC20_ABI
+from utils.contracts import get_contract
+
+MAX_UINT256 = 2**256 - 1
+# Allowance не меньше этого значения считается бесконечным: токены его не уменьшают
+INFINITE_ALLOWANCE = 2**255
+
+
+class AllowanceCache:
+    def __init__(self):
+        """
+        Локальная модель allowance по ключу (owner, token, spender)
+
+        allowance() читается из сети один раз, дальше значение обновляется
+        локально: approve задает его, подтвержденный свап уменьшает.
+        """
+        self._values: Dict[Tuple[str, str, str], int] = {}
+
+    @staticmethod
+    def _key(owner: str, token: str, spender: str) -> Tuple[str, str, str]:
+        return owner.lower(), token.lower(), spender.lower()
+
+    async def get(self, web3: AsyncWeb3, owner: str, token: str, spender: str) -> int:
+        """Текущий allowance, из кеша или через allowance() при первом обращении"""
+        key = self._key(owner, token, spender)
+        if key not in self._values:
+            token_contract = get_contract(web3, token, ERC20_ABI)
+            self._values[key] = await token_contract.functions.allowance(
+                web3.to_checksum_address(owner), web3.to_checksum_address(spender)
+            ).call()
+        return self._values[key]
+
+    def invalidate(self, owner: str, token: str, spender: str):
+        """Забывает значение - следующий get перечитает его из сети"""
+        self._values.pop(self._key(owner, token, spender), None)
+
+    def track_approve(self, owner: str, token: str, spender: str, amount: int, pending):
+        """
+        Учитывает отправленный approve
+
+        Значение выставляется сразу после отправки, чтобы параллельные свапы
+        не отправляли повторный approve. Если транзакция не прошла, кеш сбрасывается.
+
+        Args:
+            pending: Результат execute_transaction - хеш, None или asyncio.Task
+        """
+        if pending is None:
+            self.invalidate(owner, token, spender)
+            return
+
+        self._values[self._key(owner, token, spender)] = amount
+
+        if isinstance(pending, asyncio.Future):
+            def on_done(future: asyncio.Future):
+                if future.cancelled() or future.exception() or not future.result():
+                    self.invalidate(owner, token, spender)
+
+            pending.add_done_callback(on_done)
+
+    def spend(self, owner: str, token: str, spender: str, amount: int):
+        """Уменьшает allowance после подтвержденного свапа"""
+        key = self._key(owner, token, spender)
+        value = self._values.get(key)
+        if value is None or value >= INFINITE_ALLOWANCE:
+            return
+        self._values[key] = max(0, value - amount)
+
+
+# Общий кеш для всех модулей и аккаунтов процесса
+allowance_cache = AllowanceCache()
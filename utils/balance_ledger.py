@@ -0,0 +1,110 @@
+from typing import Dict, List
+
+from eth_utils import keccak, to_checksum_address
+from web3 import AsyncWeb3
+
+from utils.multi_balance import get_multi_balances
+from utils.networks import Monad
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+TRANSFER_TOPIC = keccak(text="Transfer(address,address,uint256)")
+# События WETH9: wrap и unwrap нативного токена
+DEPOSIT_TOPIC = keccak(text="Deposit(address,uint256)")
+WITHDRAWAL_TOPIC = keccak(text="Withdrawal(address,uint256)")
+
+
+def _topic_address(topic) -> str:
+    return "0x" + bytes(topic)[-20:].hex()
+
+
+def _data_amount(data) -> int:
+    return int.from_bytes(bytes(data)[:32], "big")
+
+
+class BalanceLedger:
+    def __init__(self, address: str, wrapped_native: str = Monad.wrapped_native):
+        """
+        Локальные балансы одного аккаунта
+
+        Балансы читаются из сети один раз (одним вызовом multi-balance контракта),
+        дальше обновляются по квитанциям: газ (gasUsed * effectiveGasPrice),
+        value транзакции и события Transfer / Deposit / Withdrawal в логах.
+        Под отправленные, но еще не подтвержденные транзакции держится резерв
+        нативного токена, поэтому проверка баланса перед отправкой не требует RPC.
+
+        Args:
+            address (str): Адрес аккаунта
+            wrapped_native (str): Адрес WMON: его Withdrawal из роутера - это MON, пришедший аккаунту
+        """
+        self.address = to_checksum_address(address)
+        self.wrapped_native = wrapped_native.lower()
+        # Адрес токена в нижнем регистре -> баланс в wei, ZERO_ADDRESS - нативный токен
+        self._balances: Dict[str, int] = {}
+        self.reserved = 0
+
+    async def balances(self, web3: AsyncWeb3, tokens: List[str]) -> List[int]:
+        """
+        Балансы tokens в wei (ZERO_ADDRESS - нативный токен)
+
+        Токены, которых еще нет в ledger'е, читаются из сети одним запросом.
+        """
+        missing = list(dict.fromkeys(token for token in tokens if token.lower() not in self._balances))
+        if missing:
+            values = await get_multi_balances(web3, [self.address], missing)
+            for token, value in zip(missing, values):
+                self._balances[token.lower()] = value
+        return [self._balances[token.lower()] for token in tokens]
+
+    async def available_native(self, web3: AsyncWeb3) -> int:
+        """Нативный баланс за вычетом резерва под неподтвержденные транзакции"""
+        native, = await self.balances(web3, [ZERO_ADDRESS])
+        return native - self.reserved
+
+    def reserve(self, amount: int):
+        """Резервирует максимальную стоимость отправляемой транзакции"""
+        self.reserved += amount
+
+    def release(self, amount: int):
+        self.reserved = max(0, self.reserved - amount)
+
+    def invalidate(self):
+        """Забывает балансы: следующее обращение перечитает их из сети"""
+        self._balances.clear()
+
+    def _adjust(self, token: str, delta: int):
+        # Токены, которые еще не читались, не трогаем: их баланс будет прочитан из сети
+        if token in self._balances:
+            self._balances[token] += delta
+
+    def apply_receipt(self, receipt, tx_data: dict):
+        """Обновляет балансы по квитанции транзакции tx_data, отправленной этим аккаунтом"""
+        me = self.address.lower()
+        native_delta = -receipt["gasUsed"] * receipt.get("effectiveGasPrice", tx_data.get("maxFeePerGas", 0))
+
+        if receipt["status"] == 1:
+            native_delta -= tx_data.get("value", 0)
+            for log in receipt["logs"]:
+                topics = log["topics"]
+                if not topics:
+                    continue
+                topic = bytes(topics[0])
+                token = log["address"].lower()
+
+                if topic == TRANSFER_TOPIC and len(topics) == 3:
+                    amount = _data_amount(log["data"])
+                    if _topic_address(topics[1]) == me:
+                        self._adjust(token, -amount)
+                    if _topic_address(topics[2]) == me:
+                        self._adjust(token, amount)
+                elif token == self.wrapped_native and topic == WITHDRAWAL_TOPIC:
+                    # unwrap делает роутер (или сам аккаунт), MON в этих транзакциях уходит отправителю
+                    amount = _data_amount(log["data"])
+                    native_delta += amount
+                    if _topic_address(topics[1]) == me:
+                        self._adjust(token, -amount)
+                elif token == self.wrapped_native and topic == DEPOSIT_TOPIC:
+                    if _topic_address(topics[1]) == me:
+                        self._adjust(token, _data_amount(log["data"]))
+
+        self._adjust(ZERO_ADDRESS, native_delta)
@@ -0,0 +1,153 @@
+"""
+Быстрое кодирование calldata для фиксированных методов роутеров
+
+Вместо общего ABI-кодировщика web3 calldata пишется напрямую в заранее
+выделенный bytearray по известной раскладке head/tail. Совпадение с web3
+побайтно проверяется в benchmarks/calldata.py.
+"""
+from typing import List
+
+from eth_utils import keccak
+
+WORD = 32
+UINT128_MAX = 2**128 - 1
+
+
+def _selector(signature: str) -> bytes:
+    return keccak(text=signature)[:4]
+
+
+SWAP_EXACT_ETH_FOR_TOKENS = _selector("swapExactETHForTokens(uint256,address[],address,uint256)")
+SWAP_EXACT_TOKENS_FOR_ETH = _selector("swapExactTokensForETH(uint256,uint256,address[],address,uint256)")
+SWAP_EXACT_TOKENS_FOR_TOKENS = _selector("swapExactTokensForTokens(uint256,uint256,address[],address,uint256)")
+SWAP_AMOUNT = _selector("swapAmount((bytes,address,uint128,uint256,uint256))")
+UNWRAP_WETH9 = _selector("unwrapWETH9(uint256,address)")
+REFUND_ETH = _selector("refundETH()")
+MULTICALL = _selector("multicall(bytes[])")
+APPROVE = _selector("approve(address,uint256)")
+
+
+def _padded(length: int) -> int:
+    return (length + WORD - 1) // WORD * WORD
+
+
+def _address(address: str) -> bytes:
+    raw = bytes.fromhex(address[2:] if address[:2] in ("0x", "0X") else address)
+    if len(raw) != 20:
+        raise ValueError(f"Некорректный адрес: {address}")
+    return raw
+
+
+def _put_uint(buf: bytearray, offset: int, value: int):
+    # to_bytes сам отклоняет отрицательные значения и значения больше uint256
+    buf[offset : offset + WORD] = value.to_bytes(WORD, "big")
+
+
+def _put_address(buf: bytearray, offset: int, address: str):
+    # Адрес выравнивается вправо, первые 12 байт уже нулевые
+    buf[offset + 12 : offset + WORD] = _address(address)
+
+
+def _encode_v2_swap(selector: bytes, amounts: List[int], path: List[str], to: str, deadline: int) -> bytes:
+    """
+    Свапы UniswapV2-роутера: (amounts..., address[] path, address to, uint256 deadline)
+    """
+    head_words = len(amounts) + 3
+    buf = bytearray(4 + WORD * (head_words + 1 + len(path)))
+    buf[0:4] = selector
+
+    offset = 4
+    for amount in amounts:
+        _put_uint(buf, offset, amount)
+        offset += WORD
+    # Смещение массива path считается от начала аргументов
+    _put_uint(buf, offset, WORD * head_words)
+    _put_address(buf, offset + WORD, to)
+    _put_uint(buf, offset + 2 * WORD, deadline)
+
+    offset = 4 + WORD * head_words
+    _put_uint(buf, offset, len(path))
+    for address in path:
+        offset += WORD
+        _put_address(buf, offset, address)
+    return bytes(buf)
+
+
+def encode_swap_exact_eth_for_tokens(amount_out_min: int, path: List[str], to: str, deadline: int) -> bytes:
+    return _encode_v2_swap(SWAP_EXACT_ETH_FOR_TOKENS, [amount_out_min], path, to, deadline)
+
+
+def encode_swap_exact_tokens_for_eth(
+    amount_in: int, amount_out_min: int, path: List[str], to: str, deadline: int
+) -> bytes:
+    return _encode_v2_swap(SWAP_EXACT_TOKENS_FOR_ETH, [amount_in, amount_out_min], path, to, deadline)
+
+
+def encode_swap_exact_tokens_for_tokens(
+    amount_in: int, amount_out_min: int, path: List[str], to: str, deadline: int
+) -> bytes:
+    return _encode_v2_swap(SWAP_EXACT_TOKENS_FOR_TOKENS, [amount_in, amount_out_min], path, to, deadline)
+
+
+def encode_swap_amount(path: bytes, recipient: str, amount: int, min_acquired: int, deadline: int) -> bytes:
+    """
+    iZiSwap swapAmount((bytes path, address recipient, uint128 amount, uint256 minAcquired, uint256 deadline))
+    """
+    if not 0 <= amount <= UINT128_MAX:
+        raise ValueError(f"amount не помещается в uint128: {amount}")
+
+    # selector | смещение структуры | 5 слов структуры | длина path | path с выравниванием
+    buf = bytearray(4 + WORD * 7 + _padded(len(path)))
+    buf[0:4] = SWAP_AMOUNT
+    _put_uint(buf, 4, WORD)
+
+    base = 4 + WORD
+    _put_uint(buf, base, WORD * 5)  # смещение path внутри структуры
+    _put_address(buf, base + WORD, recipient)
+    _put_uint(buf, base + 2 * WORD, amount)
+    _put_uint(buf, base + 3 * WORD, min_acquired)
+    _put_uint(buf, base + 4 * WORD, deadline)
+    _put_uint(buf, base + 5 * WORD, len(path))
+    buf[base + 6 * WORD : base + 6 * WORD + len(path)] = path
+    return bytes(buf)
+
+
+def encode_unwrap_weth9(min_amount: int, recipient: str) -> bytes:
+    buf = bytearray(4 + 2 * WORD)
+    buf[0:4] = UNWRAP_WETH9
+    _put_uint(buf, 4, min_amount)
+    _put_address(buf, 4 + WORD, recipient)
+    return bytes(buf)
+
+
+def encode_approve(spender: str, amount: int) -> bytes:
+    """ERC20 approve(address spender, uint256 amount)"""
+    buf = bytearray(4 + 2 * WORD)
+    buf[0:4] = APPROVE
+    _put_address(buf, 4, spender)
+    _put_uint(buf, 4 + WORD, amount)
+    return bytes(buf)
+
+
+def encode_refund_eth() -> bytes:
+    return REFUND_ETH
+
+
+def encode_multicall(calls: List[bytes]) -> bytes:
+    """multicall(bytes[] data)"""
+    size = 4 + WORD * (2 + len(calls)) + sum(WORD + _padded(len(call)) for call in calls)
+    buf = bytearray(size)
+    buf[0:4] = MULTICALL
+    _put_uint(buf, 4, WORD)
+    _put_uint(buf, 4 + WORD, len(calls))
+
+    # Смещения элементов считаются от начала области смещений (сразу после длины массива)
+    offsets_start = 4 + 2 * WORD
+    offset = WORD * len(calls)
+    for i, call in enumerate(calls):
+        _put_uint(buf, offsets_start + WORD * i, offset)
+        position = offsets_start + offset
+        _put_uint(buf, position, len(call))
+        buf[position + WORD : position + WORD + len(call)] = call
+        offset += WORD + _padded(len(call))
+    return bytes(buf)
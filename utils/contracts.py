@@ -0,0 +1,74 @@
+import weakref
+from typing import Dict, List, Tuple
+
+from eth_abi import encode
+from eth_utils import keccak, to_checksum_address
+from eth_utils.abi import collapse_if_tuple
+from web3 import AsyncWeb3
+from web3.contract import AsyncContract
+
+
+class ContractABI:
+    def __init__(self, abi: list):
+        """
+        Разобранный ABI: селекторы и типы аргументов функций считаются один раз
+
+        Args:
+            abi (list): ABI контракта
+        """
+        self.abi = abi
+        # Имя функции -> (селектор, типы аргументов). Для перегрузок берется первая
+        self.functions: Dict[str, Tuple[bytes, List[str]]] = {}
+        for item in abi:
+            if item.get("type") != "function":
+                continue
+            types = [collapse_if_tuple(arg) for arg in item.get("inputs", [])]
+            selector = keccak(text=f"{item['name']}({','.join(types)})")[:4]
+            self.functions.setdefault(item["name"], (selector, types))
+
+    def selector(self, name: str) -> bytes:
+        return self.functions[name][0]
+
+    def encode(self, name: str, args: list) -> str:
+        """
+        Calldata вызова name(*args), как Contract.encode_abi
+
+        Структуры передаются кортежами в порядке полей.
+        """
+        selector, types = self.functions[name]
+        return "0x" + (selector + encode(types, args)).hex()
+
+
+# Разобранные ABI по id списка ABI (списки ABI - модульные константы, живут весь процесс)
+_abis: Dict[int, ContractABI] = {}
+# Контракты по клиенту: web3 -> {(адрес, id ABI): контракт}
+_contracts: "weakref.WeakKeyDictionary[AsyncWeb3, Dict[Tuple[str, int], AsyncContract]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_abi(abi: list) -> ContractABI:
+    """Общий для процесса разобранный ABI"""
+    parsed = _abis.get(id(abi))
+    if parsed is None or parsed.abi is not abi:
+        parsed = ContractABI(abi)
+        _abis[id(abi)] = parsed
+    return parsed
+
+
+def get_contract(web3: AsyncWeb3, address: str, abi: list) -> AsyncContract:
+    """
+    Контракт, привязанный к web3, создается один раз на пару (адрес, ABI)
+
+    web3.eth.contract() заново разбирает ABI и строит классы функций при каждом
+    вызове, поэтому модули и аккаунты с общим web3 (см. utils.rpc.get_web3)
+    получают один и тот же экземпляр.
+    """
+    address = to_checksum_address(address)
+    contracts = _contracts.setdefault(web3, {})
+    key = (address, id(get_abi(abi).abi))
+    contract = contracts.get(key)
+    if contract is None:
+        contract = web3.eth.contract(address=address, abi=abi)
+        contracts[key] = contract
+    return contract
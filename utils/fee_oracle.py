@@ -0,0 +1,78 @@
+import asyncio
+import statistics
+import time
+from typing import Dict, Optional
+
+from web3 import AsyncWeb3
+
+from general_settings import FEE_CACHE_TTL, FEE_HISTORY_BLOCKS
+from utils.logger import logger
+from utils.rpc_pool import per_rpc
+
+
+class FeeOracle:
+    def __init__(self, ttl: float = FEE_CACHE_TTL, history_blocks: int = FEE_HISTORY_BLOCKS):
+        """
+        Общий кеш параметров газа (EIP-1559) для одного RPC
+
+        Вместо get_block("latest") + max_priority_fee на каждую транзакцию делает
+        один eth_feeHistory и раздает результат всем модулям и аккаунтам
+        в течение ttl секунд.
+
+        Args:
+            ttl (float): Время жизни кеша, секунд
+            history_blocks (int): Сколько последних блоков брать для оценки priority fee
+        """
+        self.ttl = ttl
+        self.history_blocks = history_blocks
+        self._gas_params: Optional[Dict[str, int]] = None
+        self._updated_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def _fetch(self, web3: AsyncWeb3) -> Dict[str, int]:
+        history = await web3.eth.fee_history(self.history_blocks, "latest", [50])
+
+        # Последний элемент baseFeePerGas - base fee следующего блока
+        base_fee = history["baseFeePerGas"][-1]
+        rewards = [reward[0] for reward in history.get("reward", []) if reward and reward[0] > 0]
+        if rewards:
+            max_priority_fee = int(statistics.median(rewards))
+        else:
+            # Пустые блоки не дают оценки - спрашиваем RPC напрямую
+            max_priority_fee = await web3.eth.max_priority_fee
+
+        return {
+            "maxFeePerGas": base_fee + max_priority_fee,
+            "maxPriorityFeePerGas": max_priority_fee,
+        }
+
+    async def _refresh(self, web3: AsyncWeb3) -> Dict[str, int]:
+        try:
+            self._gas_params = await self._fetch(web3)
+            self._updated_at = time.monotonic()
+            return self._gas_params
+        finally:
+            self._refresh_task = None
+
+    async def get_gas_params(self, web3: AsyncWeb3) -> Dict[str, int]:
+        """Возвращает maxFeePerGas / maxPriorityFeePerGas, обновляя кеш не чаще раза в ttl"""
+        if self._gas_params is not None and time.monotonic() - self._updated_at < self.ttl:
+            return dict(self._gas_params)
+
+        # Одновременные запросы ждут одно обновление вместо отдельных вызовов RPC
+        task = self._refresh_task
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._refresh(web3))
+            self._refresh_task = task
+
+        try:
+            return dict(await asyncio.shield(task))
+        except Exception as e:
+            if self._gas_params is None:
+                raise
+            logger.warning(f"FeeOracle: Не удалось обновить газ, используем кеш: {repr(e)}")
+            return dict(self._gas_params)
+
+
+# Общий FeeOracle на RPC: кеш eth_feeHistory один для всех аккаунтов и прокси
+get_fee_oracle = per_rpc(FeeOracle)
@@ -0,0 +1,127 @@
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional
+
+from eth_utils import to_checksum_address
+
+from general_settings import (
+    GAS_PROFILES_PATH,
+    GAS_PROFILE_PERCENTILE,
+    GAS_PROFILE_MARGIN,
+    GAS_PROFILE_MIN_SAMPLES,
+    GAS_PROFILE_MAX_SAMPLES,
+)
+from utils.logger import logger
+
+# Как часто сохранять профили на диск при новых замерах, секунд
+SAVE_INTERVAL = 10
+# Транзакция с ошибкой, потратившая не меньше этой доли лимита, считается упавшей по газу
+OUT_OF_GAS_RATIO = 0.97
+
+
+def gas_key(tx_data: dict) -> str:
+    """
+    Ключ профиля: контракт, метод и размер calldata
+
+    Размер calldata однозначно задается длиной пути свапа (и числом вызовов
+    в multicall), поэтому ключ соответствует (роутер, метод, длина пути).
+    """
+    data = tx_data.get("data") or "0x"
+    return f"{to_checksum_address(tx_data['to'])}:{data[:10]}:{(len(data) - 2) // 2}"
+
+
+class GasProfiles:
+    def __init__(
+        self,
+        path: str = GAS_PROFILES_PATH,
+        percentile: float = GAS_PROFILE_PERCENTILE,
+        margin: float = GAS_PROFILE_MARGIN,
+        min_samples: int = GAS_PROFILE_MIN_SAMPLES,
+        max_samples: int = GAS_PROFILE_MAX_SAMPLES,
+    ):
+        """
+        Лимиты газа, выученные по gasUsed из квитанций
+
+        Для каждого ключа (см. gas_key) хранятся последние max_samples значений
+        gasUsed успешных транзакций. Лимит - percentile-й процентиль плюс margin,
+        пока замеров меньше min_samples, профиля нет и модуль оценивает газ сам.
+        Профили общие для всех аккаунтов и сохраняются между запусками.
+
+        Args:
+            path (str): Файл профилей ("" - только в памяти)
+            percentile (float): Процентиль gasUsed, %
+            margin (float): Запас сверху, доля
+            min_samples (int): Минимум замеров для использования профиля
+            max_samples (int): Сколько последних замеров хранить
+        """
+        self.path = path
+        self.percentile = percentile
+        self.margin = margin
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self._samples: Optional[Dict[str, List[int]]] = None
+        self._dirty = False
+        self._saved_at = 0.0
+
+    def _profiles(self) -> Dict[str, List[int]]:
+        # Файл читается при первом обращении, а не при импорте
+        if self._samples is None:
+            self._samples = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as file:
+                        self._samples = {key: list(values) for key, values in json.load(file).items()}
+                except (OSError, ValueError) as e:
+                    logger.warning(f"GasProfiles: Не удалось прочитать {self.path}, профили с нуля: {repr(e)}")
+        return self._samples
+
+    def limit(self, tx_data: dict) -> Optional[int]:
+        """Лимит газа для транзакции по профилю или None, если профиля еще нет"""
+        samples = self._profiles().get(gas_key(tx_data))
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = max(0, math.ceil(len(ordered) * self.percentile / 100) - 1)
+        return int(ordered[index] * (1 + self.margin))
+
+    def observe(self, tx_data: dict, receipt) -> None:
+        """Учитывает квитанцию транзакции tx_data"""
+        key = gas_key(tx_data)
+        gas_used = receipt["gasUsed"]
+        if receipt["status"] == 1:
+            samples = self._profiles().setdefault(key, [])
+            samples.append(gas_used)
+            del samples[: -self.max_samples]
+        elif gas_used >= tx_data.get("gas", 0) * OUT_OF_GAS_RATIO:
+            # Не хватило газа - профиль устарел, до новых замеров снова estimate_gas
+            if self._profiles().pop(key, None) is not None:
+                logger.warning(f"GasProfiles: Транзакция упала по газу, профиль {key} сброшен")
+        else:
+            return
+
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        """Сохраняет профили на диск (атомарно, через временный файл)"""
+        if not self._dirty or not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as file:
+                json.dump(self._profiles(), file)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning(f"GasProfiles: Не удалось сохранить {self.path}: {repr(e)}")
+            return
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+
+gas_profiles = GasProfiles()
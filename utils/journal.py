@@ -0,0 +1,133 @@
+import os
+import sqlite3
+import time
+from typing import Callable, List, Optional, Set, Tuple
+
+from utils.logger import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL,
+    at REAL NOT NULL,
+    account TEXT NOT NULL,
+    task TEXT,
+    kind TEXT NOT NULL,
+    state TEXT NOT NULL,
+    tx_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS events_run_account ON events (run_id, account, kind);
+"""
+
+# Состояния в журнале
+STARTED = "started"
+DONE = "done"
+FAILED = "failed"
+TX_SENT = "sent"
+TX_CONFIRMED = "confirmed"
+TX_DROPPED = "dropped"
+
+
+class RunJournal:
+    def __init__(self, path: str):
+        """
+        Журнал запуска: переходы состояний аккаунтов, заданий и транзакций
+
+        Записи только добавляются (SQLite в режиме WAL, каждая запись сразу
+        фиксируется), поэтому после падения или Ctrl+C в журнале остается все,
+        что было сделано до этого момента. По нему прерванный запуск можно
+        продолжить: пропустить выполненные аккаунты и задания и дождаться
+        транзакций, которые были отправлены, но не подтверждены.
+
+        Args:
+            path (str): Путь к файлу журнала
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self.run_id: Optional[int] = None
+
+    def start_run(self, resume: bool) -> bool:
+        """
+        Начинает новый запуск или продолжает последний незавершенный
+
+        Returns:
+            bool: True, если продолжается прерванный запуск
+        """
+        row = self._db.execute("SELECT id, finished_at FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+        if resume and row is not None and row[1] is None:
+            self.run_id = row[0]
+            return True
+
+        self.run_id = self._db.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),)).lastrowid
+        return False
+
+    def finish_run(self):
+        self._db.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), self.run_id))
+
+    def record(self, account: str, kind: str, state: str, task: str = None, tx_hash: str = None):
+        """Добавляет переход состояния: kind - account / task / tx"""
+        self._db.execute(
+            "INSERT INTO events (run_id, at, account, task, kind, state, tx_hash) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.run_id, time.time(), account, task, kind, state, tx_hash),
+        )
+
+    def tx_recorder(self, account: str, task: str) -> Callable[[str, str], None]:
+        """Функция записи состояний транзакций задания для TxPipeline.journal"""
+        def record(tx_hash: str, state: str):
+            self.record(account, "tx", state, task, tx_hash)
+
+        return record
+
+    def done_accounts(self) -> Set[str]:
+        rows = self._db.execute(
+            "SELECT account FROM events WHERE run_id = ? AND kind = 'account' AND state = ?", (self.run_id, DONE)
+        )
+        return {row[0] for row in rows}
+
+    def done_tasks(self, account: str) -> Set[str]:
+        rows = self._db.execute(
+            "SELECT task FROM events WHERE run_id = ? AND account = ? AND kind = 'task' AND state = ?",
+            (self.run_id, account, DONE),
+        )
+        return {row[0] for row in rows}
+
+    def pending_transactions(self, account: str) -> List[Tuple[Optional[str], str]]:
+        """Отправленные, но не подтвержденные транзакции аккаунта: (задание, хеш)"""
+        rows = self._db.execute(
+            """
+            SELECT task, tx_hash FROM events
+            WHERE run_id = ? AND account = ? AND kind = 'tx'
+            GROUP BY tx_hash
+            HAVING SUM(state != ?) = 0
+            """,
+            (self.run_id, account, TX_SENT),
+        )
+        return [(row[0], row[1]) for row in rows]
+
+    def close(self):
+        self._db.close()
+
+
+def open_journal(path: str, resume: bool) -> Optional[RunJournal]:
+    """Открывает журнал запуска (None, если путь не задан или файл недоступен)"""
+    if not path:
+        return None
+    try:
+        journal = RunJournal(path)
+        if journal.start_run(resume):
+            logger.info(f"Journal: Продолжение прерванного запуска №{journal.run_id} ({path})")
+        return journal
+    except sqlite3.Error as e:
+        logger.error(f"Journal: Не удалось открыть журнал {path}, запуск без него: {repr(e)}")
+        return None
@@ -0,0 +1,30 @@
+from typing import List
+
+from web3 import AsyncWeb3, Web3
+
+from utils.contracts import get_contract
+
+# Контракт чтения балансов: balances(users, tokens) возвращает матрицу users × tokens одним вызовом
+MULTI_BALANCE_CONTRACT = "0xe1bEECa48cA52f9475A27891844022d4C49FFde1"
+MULTI_BALANCE_ABI = [{"constant":True,"inputs":[{"name":"user","type":"address"},{"name":"token","type":"address"}],"name":"tokenBalance","outputs":[{"name":"","type":"uint256"}],"payable":False,"stateMutability":"view","type":"function"},{"constant":True,"inputs":[{"name":"users","type":"address[]"},{"name":"tokens","type":"address[]"}],"name":"balances","outputs":[{"name":"","type":"uint256[]"}],"payable":False,"stateMutability":"view","type":"function"},{"payable":True,"stateMutability":"payable","type":"fallback"}]
+
+
+async def get_multi_balances(
+    web3: AsyncWeb3, users: List[str], tokens: List[str]
+) -> List[int]:
+    """
+    Балансы users × tokens одним eth_call к контракту MULTI_BALANCE_CONTRACT
+
+    Args:
+        web3 (AsyncWeb3): Клиент RPC
+        users (List[str]): Адреса кошельков
+        tokens (List[str]): Адреса токенов, нулевой адрес - нативный MON
+
+    Returns:
+        List[int]: Балансы в wei построчно: users[0] по всем tokens, затем users[1] и т.д.
+    """
+    contract = get_contract(web3, MULTI_BALANCE_CONTRACT, MULTI_BALANCE_ABI)
+    return await contract.functions.balances(
+        [Web3.to_checksum_address(user) for user in users],
+        [Web3.to_checksum_address(token) for token in tokens],
+    ).call()
@@ -1,19 +1,26 @@
-#class Network:
-#    def __init__(self, name: str, rpc: list, chain_id: int, native_token: str):
-#        self.name = name
-#        self.rpc = rpc
-#        self.chain_id = chain_id
-#        self.native_token = native_token
-#
-#    def __repr__(self):
-#        return f"{self.name}"
-#
-#
-#MonadRPC = Network(
-#    name="Monad",
-#    rpc=["https://testnet-rpc.monad.xyz"],
-#    chain_id=10143,
-#    native_token="MON",
-#)
+from typing import List
 
-MonadRPC = "https://testnet-rpc.monad.xyz"
\ No newline at end of file
+from general_settings import MONAD_RPC_URLS
+
+
+class Network:
+    def __init__(self, name: str, rpc: List[str], chain_id: int, native_token: str, wrapped_native: str = None):
+        self.name = name
+        self.rpc = rpc
+        self.chain_id = chain_id
+        self.native_token = native_token
+        self.wrapped_native = wrapped_native
+
+    def __repr__(self):
+        return f"{self.name}"
+
+
+Monad = Network(
+    name="Monad",
+    rpc=MONAD_RPC_URLS,
+    chain_id=10143,
+    native_token="MON",
+    wrapped_native="0x760AfE86e5de5fa0Ee542fc7B7B713e1c5425701",
+)
+
+MonadRPC = Monad.rpc[0]
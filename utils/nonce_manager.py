@@ -0,0 +1,101 @@
+import asyncio
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from web3 import AsyncWeb3
+from web3.exceptions import Web3RPCError
+
+from utils.logger import logger
+from utils.rpc_pool import is_rejected
+
+T = TypeVar("T")
+
+# Ошибки RPC, после которых локальный nonce нужно сверить с сетью
+NONCE_ERRORS = ("nonce too low", "replacement transaction underpriced")
+
+
+class NonceManager:
+    def __init__(self, web3: AsyncWeb3, address: str):
+        """
+        Локальный счетчик nonce для одного адреса
+
+        Pending nonce запрашивается у RPC один раз, дальше значения выдаются
+        локально. Один экземпляр используется всеми модулями Runner'а.
+
+        Args:
+            web3 (AsyncWeb3): Клиент RPC
+            address (str): Адрес отправителя
+        """
+        self.web3 = web3
+        self.address = address
+        self._nonce: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def is_nonce_error(error: Exception) -> bool:
+        message = str(error).lower()
+        return any(text in message for text in NONCE_ERRORS)
+
+    @staticmethod
+    def is_rejection(error: BaseException) -> bool:
+        """Узел точно не принял транзакцию: ответил JSON-RPC ошибкой или запрос до него не дошел"""
+        return isinstance(error, Web3RPCError) or is_rejected(error)
+
+    async def _fetch(self) -> int:
+        return await self.web3.eth.get_transaction_count(self.address, "pending")
+
+    async def get_nonce(self) -> int:
+        """Выдает следующий nonce"""
+        async with self._lock:
+            if self._nonce is None:
+                self._nonce = await self._fetch()
+            nonce = self._nonce
+            self._nonce += 1
+            return nonce
+
+    async def release(self, nonce: int):
+        """Возвращает nonce транзакции, которая так и не была отправлена"""
+        async with self._lock:
+            if self._nonce is not None and nonce == self._nonce - 1:
+                self._nonce = nonce
+            else:
+                # После него уже выданы другие nonce - сверимся с сетью при следующем запросе
+                self._nonce = None
+
+    def forget(self):
+        """Неизвестно, ушла ли транзакция в сеть - nonce сверяется с сетью при следующем запросе"""
+        self._nonce = None
+
+    async def resync(self):
+        """Сбрасывает локальный nonce на pending nonce из сети"""
+        async with self._lock:
+            self._nonce = await self._fetch()
+            logger.info(f"NonceManager: {self.address} nonce синхронизирован: {self._nonce}")
+
+    async def send(self, send_with_nonce: Callable[[int], Awaitable[T]]) -> T:
+        """
+        Выдает nonce и вызывает send_with_nonce(nonce)
+
+        При "nonce too low" / "replacement transaction underpriced" nonce
+        синхронизируется с сетью и отправка повторяется один раз. Nonce
+        возвращается только если узел точно отклонил транзакцию; после таймаута,
+        обрыва соединения или отмены транзакция могла уйти в сеть, поэтому
+        следующая отправка берет pending nonce из сети.
+        """
+        for attempt in range(2):
+            nonce = await self.get_nonce()
+            try:
+                return await send_with_nonce(nonce)
+            except asyncio.CancelledError:
+                self.forget()
+                raise
+            except Exception as e:
+                if not self.is_nonce_error(e):
+                    if self.is_rejection(e):
+                        await self.release(nonce)
+                    else:
+                        self.forget()
+                    raise
+                logger.warning(f"NonceManager: {self.address} nonce {nonce} отклонен: {repr(e)}")
+                await self.resync()
+                if attempt:
+                    raise
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from collections import deque
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float = None):
+        """
+        Ограничение частоты запросов: rate запросов в секунду, всплеск до burst
+
+        Args:
+            rate (float): Пополнение, токенов в секунду
+            burst (float): Емкость ведра (по умолчанию rate, но не меньше 1)
+        """
+        self.rate = rate
+        self.capacity = max(1.0, burst if burst is not None else rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def available(self) -> float:
+        """Сколько запросов можно сделать прямо сейчас"""
+        self._refill()
+        return self._tokens
+
+    async def acquire(self):
+        """Забирает токен, при пустом ведре ждет его пополнения"""
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AdaptiveConcurrency:
+    def __init__(self, initial: int, maximum: int, minimum: int = 1, backoff: float = 0.5):
+        """
+        AIMD-лимит одновременных запросов
+
+        Пока ответы приходят быстро, лимит растет примерно на единицу за каждое
+        "окно" из limit успешных запросов; при перегрузке (429, таймаут) -
+        умножается на backoff. Так нагрузка держится у предела, который RPC
+        реально выдерживает.
+
+        Args:
+            initial (int): Начальный лимит
+            maximum (int): Максимальный лимит
+            minimum (int): Минимальный лимит
+            backoff (float): Во сколько раз уменьшать лимит при перегрузке
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.backoff = backoff
+        self.in_flight = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        self._decreased_at = 0.0
+
+    @property
+    def waiting(self) -> int:
+        """Сколько запросов ждут свободного слота"""
+        return len(self._waiters)
+
+    async def acquire(self):
+        """Занимает слот, ждет освобождения, если лимит исчерпан"""
+        while self.in_flight >= int(self.limit):
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                # Слот мог быть передан этому ожиданию - отдаем его следующему
+                if future.done() and not future.cancelled():
+                    self._wake()
+                raise
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            future = self._waiters.popleft()
+            # Ожидания из уже завершенного event loop пропускаем
+            if future.done() or future.get_loop().is_closed():
+                continue
+            future.set_result(None)
+            free -= 1
+
+    def on_success(self, healthy: bool):
+        """Ответ получен (вызывается до release); healthy - задержка в пределах нормы"""
+        # Лимит растет, только если он действительно был выбран
+        if healthy and self.limit < self.maximum and self.in_flight >= int(self.limit):
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._wake()
+
+    def on_overload(self, window: float):
+        """RPC перегружен; повторные сигналы в пределах window секунд считаются одним"""
+        now = time.monotonic()
+        if now - self._decreased_at < window:
+            return
+        self._decreased_at = now
+        self.limit = max(self.minimum, self.limit * self.backoff)
@@ -0,0 +1,184 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from web3 import AsyncWeb3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from general_settings import RECEIPT_POLL_INTERVAL, RECEIPT_TIMEOUT
+from utils.logger import logger
+from utils.rpc_pool import per_rpc
+
+# Сколько последних блоков держать в памяти: транзакция могла попасть в блок
+# раньше, чем ее ожидание зарегистрировано в трекере
+RECENT_BLOCKS = 16
+# При старте слежения просматриваются и несколько уже вышедших блоков
+START_LOOKBACK = 3
+# Если трекер отстал больше чем на RECENT_BLOCKS блоков, ожидающие транзакции
+# проверяются напрямую (eth_getTransactionReceipt), а не перебором всех пропущенных блоков
+# JSON-RPC "method not found" и его тексты у разных узлов: RPC не поддерживает eth_getBlockReceipts.
+# "header not found" / "block not found" сюда не относятся - это узел пула, отстающий на блок
+METHOD_NOT_FOUND = -32601
+UNSUPPORTED_ERRORS = ("-32601", "method not found", "does not exist", "not supported")
+
+
+def _is_unsupported(error: Exception) -> bool:
+    """Ошибка означает, что метод не поддерживается RPC (а не временную проблему узла)"""
+    response = getattr(error, "rpc_response", None)
+    if isinstance(response, dict) and isinstance(response.get("error"), dict):
+        if response["error"].get("code") == METHOD_NOT_FOUND:
+            return True
+    return any(text in str(error).lower() for text in UNSUPPORTED_ERRORS)
+
+
+def _key(tx_hash) -> str:
+    value = tx_hash.hex() if isinstance(tx_hash, (bytes, bytearray)) else str(tx_hash)
+    value = value.lower()
+    return value if value.startswith("0x") else "0x" + value
+
+
+class ReceiptTracker:
+    def __init__(self, poll_interval: float = RECEIPT_POLL_INTERVAL):
+        """
+        Общее ожидание подтверждений для одного RPC
+
+        Вместо опроса eth_getTransactionReceipt по каждой транзакции трекер
+        следит за новыми блоками и забирает их квитанции одним
+        eth_getBlockReceipts, разрешая все ожидающие транзакции из одного потока.
+        Если RPC не поддерживает eth_getBlockReceipts, квитанции ожидающих
+        транзакций запрашиваются пачкой раз в poll_interval. Запросы идут
+        через web3 последнего из ожидающих аккаунтов, а не того, кто запустил
+        слежение первым.
+
+        Args:
+            poll_interval (float): Как часто проверять новый блок, секунд
+        """
+        self.poll_interval = poll_interval
+        self.block_receipts_supported = True
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Через какой web3 (сессию и прокси аккаунта) искать квитанцию ожидающей транзакции
+        self._clients: Dict[str, AsyncWeb3] = {}
+        # Квитанции последних блоков: номер блока -> {хеш: квитанция}
+        self._recent: "OrderedDict[int, Dict[str, dict]]" = OrderedDict()
+        self._last_block: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait(self, web3: AsyncWeb3, tx_hash, timeout: float = RECEIPT_TIMEOUT):
+        """
+        Ждет квитанцию транзакции
+
+        Перед TimeExhausted квитанция один раз запрашивается напрямую.
+
+        Raises:
+            TimeExhausted: Если транзакция не попала в блок за timeout секунд
+        """
+        key = _key(tx_hash)
+        for receipts in self._recent.values():
+            if key in receipts:
+                return receipts[key]
+
+        future = self._pending.get(key)
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+        # Переставляем в конец: слежение идет через web3 последнего ожидающего
+        self._clients.pop(key, None)
+        self._clients[key] = web3
+        self._ensure_running()
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            # Ожидание закончилось без квитанции (таймаут или отмена) - больше ее не ищем
+            if not future.done() and self._pending.get(key) is future:
+                del self._pending[key]
+                self._clients.pop(key, None)
+
+        # Блок с транзакцией мог не попасть в слежение (ошибки RPC) - последняя прямая проверка
+        try:
+            receipt = await self._lookup(web3, key)
+        except Exception as e:
+            logger.warning(f"ReceiptTracker: Не удалось запросить квитанцию {key}: {repr(e)}")
+            receipt = None
+        if receipt is not None:
+            return receipt
+        raise TimeExhausted(f"Транзакция {key} не подтверждена за {timeout} сек.")
+
+    def _ensure_running(self):
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._task = asyncio.ensure_future(self._follow())
+
+    async def _follow(self):
+        try:
+            while self._pending and self._clients:
+                web3 = next(reversed(self._clients.values()))
+                try:
+                    if self.block_receipts_supported:
+                        await self._poll_blocks(web3)
+                    else:
+                        await self._poll_transactions(web3)
+                except Exception as e:
+                    logger.warning(f"ReceiptTracker: Ошибка при получении квитанций: {repr(e)}")
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            self._task = None
+
+    async def _poll_blocks(self, web3: AsyncWeb3):
+        head = await web3.eth.block_number
+        if self._last_block is None:
+            self._last_block = head - START_LOOKBACK
+        elif self._last_block < head - RECENT_BLOCKS:
+            # Трекер простаивал или отстал: пропущенные блоки не перебираем, а проверяем ожидающие транзакции
+            await self._poll_transactions(web3)
+            self._last_block = head - START_LOOKBACK
+
+        for number in range(self._last_block + 1, head + 1):
+            try:
+                receipts = await web3.eth.get_block_receipts(number)
+            except Exception as e:
+                # Остальные ошибки (в том числе отставание узла на блок) - блок запрашивается снова при следующем опросе
+                if _is_unsupported(e):
+                    logger.warning(
+                        "ReceiptTracker: RPC не поддерживает eth_getBlockReceipts, "
+                        "квитанции будут запрашиваться по транзакциям"
+                    )
+                    self.block_receipts_supported = False
+                    return
+                raise
+
+            self._remember(number, {_key(receipt["transactionHash"]): receipt for receipt in receipts})
+            self._last_block = number
+
+    async def _poll_transactions(self, web3: AsyncWeb3):
+        keys = list(self._pending)
+        receipts = await asyncio.gather(*(self._lookup(web3, key) for key in keys))
+        for key, receipt in zip(keys, receipts):
+            if receipt is not None:
+                self._resolve(key, receipt)
+
+    @staticmethod
+    async def _lookup(web3: AsyncWeb3, key: str):
+        try:
+            return await web3.eth.get_transaction_receipt(key)
+        except TransactionNotFound:
+            return None
+
+    def _remember(self, number: int, receipts: Dict[str, dict]):
+        self._recent[number] = receipts
+        while len(self._recent) > RECENT_BLOCKS:
+            self._recent.popitem(last=False)
+        for key in [key for key in self._pending if key in receipts]:
+            self._resolve(key, receipts[key])
+
+    def _resolve(self, key: str, receipt):
+        future = self._pending.pop(key, None)
+        self._clients.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(receipt)
+
+
+# Общий ReceiptTracker на RPC: один поток слежения за блоками для всех аккаунтов
+get_receipt_tracker = per_rpc(ReceiptTracker)
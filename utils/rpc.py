@@ -0,0 +1,84 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+from web3 import AsyncWeb3
+
+from utils.networks import Monad, Network
+from utils.rpc_pool import PooledProvider, get_pool
+
+# Реестр провайдеров: один AsyncWeb3 (и одна пул-сессия) на пару (сеть, прокси).
+# Модули и аккаунты с одинаковым прокси переиспользуют уже открытые соединения.
+_async_web3: Dict[Tuple[str, Optional[str]], Tuple[AsyncWeb3, asyncio.AbstractEventLoop]] = {}
+
+
+async def get_web3(proxy: Optional[str] = None, network: Network = Monad) -> AsyncWeb3:
+    """
+    Возвращает общий AsyncWeb3 для пары (network, proxy)
+
+    Args:
+        proxy (Optional[str]): Прокси в формате user:pass@host:port
+        network (Network): Сеть, запросы распределяются по ее RPC через RpcPool
+
+    Returns:
+        AsyncWeb3: Клиент с keep-alive пулом соединений на RPC_POOL_SIZE
+    """
+    key = (network.name, proxy)
+    loop = asyncio.get_running_loop()
+
+    cached = _async_web3.get(key)
+    # Сессия aiohttp привязана к event loop, после asyncio.run() ее нужно пересоздать
+    if cached is not None and cached[1] is loop:
+        return cached[0]
+
+    web3 = AsyncWeb3(PooledProvider(get_pool(network), proxy))
+    _async_web3[key] = (web3, loop)
+    return web3
+
+
+async def close_sessions():
+    """Закрывает все пул-сессии текущего event loop"""
+    loop = asyncio.get_running_loop()
+    # Сначала убираем из реестра: get_web3 во время закрытия создаст новую сессию, а не вернет закрываемую
+    closing = [key for key, (_, web3_loop) in _async_web3.items() if web3_loop is loop]
+    for key in closing:
+        web3, _ = _async_web3.pop(key)
+        await web3.provider.disconnect()
+
+
+# Сколько запусков (Process.run, check_balances) сейчас используют сессии каждого event loop
+_session_users: Dict[asyncio.AbstractEventLoop, int] = {}
+
+
+@asynccontextmanager
+async def rpc_sessions():
+    """
+    Область использования пул-сессий одним запуском
+
+    Сессии общие для всех запусков в event loop (в боте /run и /balance
+    могут идти одновременно), поэтому закрываются при выходе последнего
+    из них, а не каждого.
+    """
+    loop = asyncio.get_running_loop()
+    _session_users[loop] = _session_users.get(loop, 0) + 1
+    try:
+        yield
+    finally:
+        _session_users[loop] -= 1
+        if not _session_users[loop]:
+            del _session_users[loop]
+            await close_sessions()
+
+
+# chainId по адресу RPC: не меняется, запрашивается один раз за процесс
+_chain_ids: Dict[str, int] = {}
+
+
+async def get_chain_id(web3: AsyncWeb3) -> int:
+    """chainId сети, к которой подключен web3, без eth_chainId на каждую транзакцию"""
+    rpc_url = str(web3.provider.endpoint_uri)
+    chain_id = _chain_ids.get(rpc_url)
+    if chain_id is None:
+        chain_id = await web3.eth.chain_id
+        _chain_ids[rpc_url] = chain_id
+    return chain_id
@@ -0,0 +1,473 @@
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import aiohttp
+from web3 import AsyncWeb3
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+from general_settings import (
+    RPC_POOL_SIZE,
+    RPC_KEEPALIVE,
+    RPC_TIMEOUT,
+    RPC_RATE_LIMIT,
+    RPC_HEDGE_DELAY,
+    RPC_EJECT_FAILURES,
+    RPC_COOLDOWN,
+    RPC_HEALTH_INTERVAL,
+    RPC_MAX_BLOCK_LAG,
+    RPC_PROXY_RATE_LIMIT,
+    RPC_CONCURRENCY_START,
+    RPC_CONCURRENCY_MAX,
+    RPC_THROTTLE_RETRIES,
+    RPC_THROTTLE_BACKOFF,
+)
+from utils.logger import logger
+from utils.networks import Network
+from utils.rate_limit import AdaptiveConcurrency, TokenBucket
+
+# Чтения, которые не меняют состояние сети: если основной RPC не ответил за
+# RPC_HEDGE_DELAY, тот же запрос параллельно уходит на следующий RPC
+HEDGED_METHODS = {
+    "eth_call",
+    "eth_getBalance",
+    "eth_blockNumber",
+    "eth_chainId",
+    "eth_feeHistory",
+    "eth_maxPriorityFeePerGas",
+    "eth_gasPrice",
+    "eth_estimateGas",
+    "eth_getBlockByNumber",
+    "eth_getBlockReceipts",
+    "eth_getTransactionReceipt",
+}
+# Запросы, повтор которых на другом RPC после таймаута может задвоить действие
+NOT_IDEMPOTENT_METHODS = {"eth_sendRawTransaction"}
+# Признаки ответа "слишком много запросов" в теле JSON-RPC ошибки
+RATE_LIMIT_ERRORS = (b"-32005", b"rate limit", b"too many requests", b"request limit")
+# HTTP статусы, при которых RPC точно не выполнил запрос
+REJECTED_STATUSES = {429, 502, 503, 504}
+# Вес нового замера в скользящей средней задержки
+LATENCY_ALPHA = 0.3
+# Ответ медленнее средней задержки во столько раз не считается "здоровым" для роста лимита
+HEALTHY_LATENCY_FACTOR = 2
+# Минимальное окно, в котором несколько сигналов перегрузки уменьшают лимит один раз
+MIN_OVERLOAD_WINDOW = 0.2
+# Максимальный множитель паузы для RPC, который выбывает несколько раз подряд
+MAX_COOLDOWN_POWER = 4
+
+PostFunc = Callable[["Endpoint", bytes], Awaitable[bytes]]
+
+
+class RpcRateLimited(Exception):
+    """RPC ответил ошибкой ограничения частоты запросов"""
+
+
+class NoRpcAvailable(Exception):
+    """В пуле нет RPC, на который можно отправить запрос"""
+
+
+def is_overload(error: BaseException) -> bool:
+    """Ошибка говорит о перегрузке RPC (429, лимит, таймаут), а не о его неработоспособности"""
+    if isinstance(error, (RpcRateLimited, asyncio.TimeoutError)):
+        return True
+    return isinstance(error, aiohttp.ClientResponseError) and error.status == 429
+
+
+def is_rejected(error: BaseException) -> bool:
+    """RPC гарантированно не принял запрос (его можно отправить заново, в том числе транзакцию)"""
+    if isinstance(error, (RpcRateLimited, aiohttp.ClientConnectorError)):
+        return True
+    return isinstance(error, aiohttp.ClientResponseError) and error.status in REJECTED_STATUSES
+
+
+class Endpoint:
+    def __init__(self, url: str, rate_limit: float = RPC_RATE_LIMIT):
+        """
+        Один RPC пула и его статистика
+
+        Задержка и ошибки общие для всех прокси, а AIMD-лимит одновременных
+        запросов у каждого прокси свой: перегрузка одного выхода не снижает
+        лимит остальным.
+
+        Args:
+            url (str): Адрес RPC
+            rate_limit (float): Запросов в секунду (0 - без ограничения)
+        """
+        self.url = url
+        self.bucket = TokenBucket(rate_limit) if rate_limit > 0 else None
+        self._limits: Dict[Optional[str], AdaptiveConcurrency] = {}
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.ejections = 0
+        self.unhealthy_until = 0.0
+        self.block_number: Optional[int] = None
+        self.wrong_chain = False
+
+    def __repr__(self):
+        return self.url
+
+    def concurrency(self, proxy: Optional[str] = None) -> AdaptiveConcurrency:
+        """Лимит одновременных запросов к RPC через proxy"""
+        limit = self._limits.get(proxy)
+        if limit is None:
+            limit = AdaptiveConcurrency(RPC_CONCURRENCY_START, RPC_CONCURRENCY_MAX)
+            self._limits[proxy] = limit
+        return limit
+
+    @property
+    def in_flight(self) -> int:
+        return sum(limit.in_flight for limit in self._limits.values())
+
+    def is_healthy(self, now: float) -> bool:
+        return not self.wrong_chain and now >= self.unhealthy_until
+
+    def score(self, proxy: Optional[str] = None) -> float:
+        """Чем меньше, тем лучше: задержка с учетом текущей нагрузки и очереди прокси"""
+        # Еще не измеренный RPC пробуется в первую очередь, чтобы получить оценку
+        if self.latency is None:
+            return 0.0
+        limit = self._limits.get(proxy)
+        score = self.latency * (1 + self.in_flight + (limit.waiting if limit is not None else 0))
+        if self.bucket is not None and self.bucket.available() < 1:
+            score += 1 / self.bucket.rate
+        return score
+
+    def record_success(self, latency: float, proxy: Optional[str] = None):
+        healthy = self.latency is None or latency <= HEALTHY_LATENCY_FACTOR * self.latency
+        self.concurrency(proxy).on_success(healthy)
+        self.latency = latency if self.latency is None else (
+            LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self.latency
+        )
+        self.failures = 0
+        self.ejections = 0
+
+    def record_failure(self, error: BaseException, proxy: Optional[str] = None):
+        if is_overload(error):
+            self.concurrency(proxy).on_overload(max(self.latency or 0.0, MIN_OVERLOAD_WINDOW))
+        self.failures += 1
+        if self.failures >= RPC_EJECT_FAILURES:
+            self.eject(f"{self.failures} ошибок подряд")
+
+    def eject(self, reason: str):
+        """Выводит RPC из ротации на время, которое растет при повторных выбываниях"""
+        cooldown = RPC_COOLDOWN * 2 ** min(self.ejections, MAX_COOLDOWN_POWER)
+        self.unhealthy_until = time.monotonic() + cooldown
+        self.ejections += 1
+        self.failures = 0
+        logger.warning(f"RpcPool: {self.url} выведен из ротации на {cooldown} сек.: {reason}")
+
+
+class RpcPool:
+    def __init__(self, network: Network, hedge_delay: float = RPC_HEDGE_DELAY):
+        """
+        Пул RPC одной сети
+
+        Запрос уходит на RPC с лучшей оценкой (скользящая средняя задержки с
+        учетом запросов в работе), при сетевой ошибке, 429/5xx или ошибке
+        лимита - на следующий. RPC, которые ошибаются несколько раз подряд,
+        отстают по блокам или отвечают с другим chainId, временно выводятся
+        из ротации. Для чтений из HEDGED_METHODS включено хеджирование.
+
+        Args:
+            network (Network): Сеть и список ее RPC
+            hedge_delay (float): Через сколько секунд дублировать чтение на следующий RPC (0 - не дублировать)
+        """
+        self.network = network
+        self.hedge_delay = hedge_delay
+        self.endpoints = [Endpoint(url) for url in dict.fromkeys(network.rpc)]
+        self._checked_at = 0.0
+        self._health_task: Optional[asyncio.Task] = None
+
+    def ranked(self, proxy: Optional[str] = None) -> List[Endpoint]:
+        """RPC в порядке очередности: здоровые по оценке, затем выведенные из ротации"""
+        now = time.monotonic()
+        candidates = [endpoint for endpoint in self.endpoints if not endpoint.wrong_chain] or self.endpoints
+        return sorted(candidates, key=lambda endpoint: (not endpoint.is_healthy(now), endpoint.score(proxy)))
+
+    async def request(
+        self,
+        method: str,
+        data: bytes,
+        post: PostFunc,
+        proxy_bucket: Optional[TokenBucket] = None,
+        proxy: Optional[str] = None,
+    ) -> bytes:
+        """
+        Выполняет JSON-RPC запрос на лучшем доступном RPC
+
+        Если перегружены все RPC, запрос повторяется до RPC_THROTTLE_RETRIES раз
+        с растущей паузой, а не сразу возвращает ошибку модулю.
+
+        Args:
+            method (str): Метод JSON-RPC
+            data (bytes): Тело запроса
+            post (PostFunc): Отправка тела на конкретный RPC (сессия и прокси провайдера)
+            proxy_bucket (Optional[TokenBucket]): Ограничение частоты запросов через прокси провайдера
+            proxy (Optional[str]): Прокси провайдера: у каждого прокси свой лимит одновременных запросов
+
+        Raises:
+            NoRpcAvailable: Если в пуле нет ни одного RPC
+
+        Returns:
+            bytes: Сырой ответ RPC
+        """
+        self._schedule_health_check(post, proxy)
+
+        for attempt in range(RPC_THROTTLE_RETRIES + 1):
+            try:
+                return await self._request_once(method, data, post, proxy_bucket, proxy)
+            except Exception as e:
+                if attempt == RPC_THROTTLE_RETRIES or not is_overload(e) or not self._can_retry(method, e):
+                    raise
+                await asyncio.sleep(RPC_THROTTLE_BACKOFF * 2 ** attempt)
+
+    async def _request_once(
+        self, method: str, data: bytes, post: PostFunc, proxy_bucket: Optional[TokenBucket], proxy: Optional[str]
+    ) -> bytes:
+        candidates = iter(self.ranked(proxy))
+        hedge = method in HEDGED_METHODS and self.hedge_delay > 0
+        pending = set()
+        last_error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            endpoint = next(candidates, None)
+            if endpoint is None:
+                return False
+            pending.add(asyncio.ensure_future(self._attempt(endpoint, data, post, proxy_bucket, proxy)))
+            return True
+
+        launch()
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=self.hedge_delay if hedge else None, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Основной RPC медлит - дублируем чтение на следующий
+                    hedge = launch()
+                    continue
+
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                    if not self._can_retry(method, last_error):
+                        raise last_error
+
+                if not pending and not launch():
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if last_error is None:
+            raise NoRpcAvailable(f"В пуле сети {self.network.name} нет RPC для запроса {method}")
+        raise last_error
+
+    async def _attempt(
+        self,
+        endpoint: Endpoint,
+        data: bytes,
+        post: PostFunc,
+        proxy_bucket: Optional[TokenBucket] = None,
+        proxy: Optional[str] = None,
+    ) -> bytes:
+        if endpoint.bucket is not None:
+            await endpoint.bucket.acquire()
+        if proxy_bucket is not None:
+            await proxy_bucket.acquire()
+
+        concurrency = endpoint.concurrency(proxy)
+        await concurrency.acquire()
+        started_at = time.monotonic()
+        try:
+            raw = await post(endpoint, data)
+            if b'"error"' in raw and any(text in raw.lower() for text in RATE_LIMIT_ERRORS):
+                raise RpcRateLimited(raw[:200].decode(errors="replace"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            endpoint.record_failure(e, proxy)
+            raise
+        else:
+            endpoint.record_success(time.monotonic() - started_at, proxy)
+            return raw
+        finally:
+            concurrency.release()
+
+    @staticmethod
+    def _can_retry(method: str, error: BaseException) -> bool:
+        """Можно ли после этой ошибки отправить запрос на другой RPC"""
+        if method not in NOT_IDEMPOTENT_METHODS:
+            return True
+        # Транзакцию повторяем, только если RPC ее гарантированно не принял
+        return is_rejected(error)
+
+    def _schedule_health_check(self, post: PostFunc, proxy: Optional[str] = None):
+        if len(self.endpoints) < 2 or time.monotonic() - self._checked_at < RPC_HEALTH_INTERVAL:
+            return
+        task = self._health_task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            return
+        self._checked_at = time.monotonic()
+        self._health_task = asyncio.ensure_future(self.health_check(post, proxy))
+
+    async def health_check(self, post: PostFunc, proxy: Optional[str] = None):
+        """Проверяет chainId и высоту блока каждого RPC, отстающие выводит из ротации"""
+        async def check(endpoint: Endpoint):
+            try:
+                if endpoint.block_number is None:
+                    chain_id = await self._call(endpoint, "eth_chainId", post, proxy)
+                    if chain_id != self.network.chain_id:
+                        endpoint.wrong_chain = True
+                        logger.error(
+                            f"RpcPool: {endpoint.url} отвечает chainId {chain_id} "
+                            f"вместо {self.network.chain_id}, RPC исключен из пула"
+                        )
+                        return
+                endpoint.block_number = await self._call(endpoint, "eth_blockNumber", post, proxy)
+            except Exception as e:
+                logger.warning(f"RpcPool: {endpoint.url} не прошел проверку: {repr(e)}")
+
+        await asyncio.gather(*(check(endpoint) for endpoint in self.endpoints if not endpoint.wrong_chain))
+
+        heights = [endpoint.block_number for endpoint in self.endpoints if endpoint.block_number is not None]
+        if not heights:
+            return
+        head = max(heights)
+        for endpoint in self.endpoints:
+            if endpoint.block_number is not None and head - endpoint.block_number > RPC_MAX_BLOCK_LAG:
+                endpoint.eject(f"отстает на {head - endpoint.block_number} блоков")
+
+    async def _call(self, endpoint: Endpoint, method: str, post: PostFunc, proxy: Optional[str] = None) -> int:
+        data = json.dumps({"jsonrpc": "2.0", "id": 0, "method": method, "params": []}).encode()
+        response = json.loads(await self._attempt(endpoint, data, post, proxy=proxy))
+        if "error" in response:
+            raise ValueError(response["error"])
+        return int(response["result"], 16)
+
+
+class PooledProvider(AsyncJSONBaseProvider):
+    def __init__(self, pool: RpcPool, proxy: Optional[str] = None):
+        """
+        Провайдер AsyncWeb3 поверх RpcPool
+
+        Статистика RPC общая в пуле, а сессия aiohttp (keep-alive соединения
+        через свой прокси) - у каждого провайдера своя.
+
+        Args:
+            pool (RpcPool): Пул RPC сети
+            proxy (Optional[str]): Прокси в формате user:pass@host:port
+        """
+        super().__init__()
+        self.pool = pool
+        self.proxy = f"http://{proxy}" if proxy else None
+        # Общие кеши по RPC (газ, квитанции, chainId) ведутся по сети, а не по адресу
+        self.endpoint_uri = pool.network.name
+        self.proxy_bucket = get_proxy_bucket(proxy)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def __str__(self):
+        return f"RPC pool {self.pool.network.name}: {[endpoint.url for endpoint in self.pool.endpoints]}"
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                raise_for_status=True,
+                timeout=aiohttp.ClientTimeout(total=RPC_TIMEOUT),
+                headers={"Content-Type": "application/json"},
+                connector=aiohttp.TCPConnector(
+                    limit=RPC_POOL_SIZE,
+                    keepalive_timeout=RPC_KEEPALIVE,
+                    ssl=False,
+                ),
+            )
+        return self._session
+
+    async def _post(self, endpoint: Endpoint, data: bytes) -> bytes:
+        async with self._get_session().post(endpoint.url, data=data, proxy=self.proxy) as response:
+            return await response.read()
+
+    async def make_request(self, method, params):
+        if method == "eth_chainId":
+            # chainId сети известен, RPC с другим chainId пул выводит из ротации. Валидация web3
+            # запрашивает его перед каждым eth_call / estimate_gas - отвечаем без запроса в сеть
+            return {"jsonrpc": "2.0", "id": next(self.request_counter), "result": hex(self.pool.network.chain_id)}
+        data = self.encode_rpc_request(method, params)
+        raw = await self.pool.request(method, data, self._post, self.proxy_bucket, self.proxy)
+        return self.decode_rpc_response(raw)
+
+    async def batch_request(self, requests: List[Tuple[str, Any]]) -> list:
+        """
+        Несколько запросов одним JSON-RPC batch (один HTTP запрос)
+
+        Args:
+            requests: Пары (метод, параметры)
+
+        Returns:
+            list: Ответы RPC в порядке запросов
+        """
+        # Batch из одних чтений хеджируется так же, как одиночное чтение
+        method = "eth_call" if all(method in HEDGED_METHODS for method, _ in requests) else "batch"
+        raw = await self.pool.request(
+            method, self.encode_batch_rpc_request(requests), self._post, self.proxy_bucket, self.proxy
+        )
+        response = self.decode_rpc_response(raw)
+        if not isinstance(response, list):
+            raise ValueError(f"RPC отклонил batch запрос: {response}")
+        return sorted(response, key=lambda item: item["id"])
+
+    async def disconnect(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_pools: Dict[str, RpcPool] = {}
+# Ограничение частоты по прокси: общее для всех сетей и провайдеров с этим прокси
+_proxy_buckets: Dict[Optional[str], TokenBucket] = {}
+
+
+def get_proxy_bucket(proxy: Optional[str], rate_limit: float = RPC_PROXY_RATE_LIMIT) -> Optional[TokenBucket]:
+    """Общий TokenBucket прокси (None, если ограничение выключено)"""
+    if rate_limit <= 0:
+        return None
+    bucket = _proxy_buckets.get(proxy)
+    if bucket is None:
+        bucket = TokenBucket(rate_limit)
+        _proxy_buckets[proxy] = bucket
+    return bucket
+
+
+def get_pool(network: Network) -> RpcPool:
+    """Общий пул RPC сети на весь процесс"""
+    pool = _pools.get(network.name)
+    if pool is None:
+        pool = RpcPool(network)
+        _pools[network.name] = pool
+    return pool
+
+
+T = TypeVar("T")
+
+
+def per_rpc(factory: Callable[[], T]) -> Callable[[AsyncWeb3], T]:
+    """
+    Реестр объектов, общих для всех web3 одного RPC
+
+    Возвращает функцию web3 -> объект: на каждый endpoint_uri провайдера
+    (у PooledProvider - имя сети) factory вызывается один раз, прокси не важен.
+    """
+    instances: Dict[str, T] = {}
+
+    def get(web3: AsyncWeb3) -> T:
+        rpc_url = str(web3.provider.endpoint_uri)
+        instance = instances.get(rpc_url)
+        if instance is None:
+            instance = factory()
+            instances[rpc_url] = instance
+        return instance
+
+    return get
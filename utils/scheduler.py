@@ -0,0 +1,117 @@
+import asyncio
+import heapq
+import itertools
+import math
+from contextlib import asynccontextmanager
+from typing import List, Optional, Set, Tuple
+
+
+class Scheduler:
+    def __init__(self, workers: int = 0):
+        """
+        Планировщик шагов аккаунтов по дедлайнам
+
+        Аккаунт выполняется шагами между паузами (задания, свапы, approve).
+        Шаг занимает один из workers слотов, пауза - нет: аккаунт отдает слот
+        и встает в кучу с дедлайном "следующий шаг в T". Освободившийся слот
+        получает аккаунт с самым ранним наступившим дедлайном, поэтому
+        несколько слотов обслуживают тысячи аккаунтов, а паузы из настроек
+        соблюдаются.
+
+        Args:
+            workers (int): Сколько шагов выполняется одновременно (0 - без ограничения)
+        """
+        self.workers = workers
+        self.active = 0
+        # (дедлайн по loop.time(), порядковый номер, future ожидающего)
+        self._heap: List[Tuple[float, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        # Задачи, которые сейчас держат слот: освободить слот может только его владелец
+        self._holders: Set[asyncio.Task] = set()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at = math.inf
+
+    def _has_free_slot(self) -> bool:
+        return not self.workers or self.active < self.workers
+
+    async def acquire(self, at: float = None):
+        """Ждет дедлайна at (по loop.time(), None - сейчас) и свободного слота"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() if at is None else at
+        if not self._heap and deadline <= loop.time() and self._has_free_slot():
+            self.active += 1
+            self._holders.add(asyncio.current_task())
+            return
+
+        future = loop.create_future()
+        heapq.heappush(self._heap, (deadline, next(self._counter), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Слот уже выдан, но ожидающий отменен - возвращаем слот следующему
+                self.active -= 1
+                self._dispatch()
+            raise
+        self._holders.add(asyncio.current_task())
+
+    def release(self):
+        """Освобождает слот текущей задачи (если она его не держит - ничего не делает)"""
+        task = asyncio.current_task()
+        if task not in self._holders:
+            return
+        self._holders.discard(task)
+        self.active -= 1
+        self._dispatch()
+
+    async def sleep(self, delay: float):
+        """Пауза аккаунта, держащего слот: на время паузы слот достается другим аккаунтам"""
+        if not self.workers or asyncio.current_task() not in self._holders:
+            await asyncio.sleep(delay)
+            return
+        loop = asyncio.get_running_loop()
+        # Отмена во время ожидания оставляет задачу без слота, release() в slot() это учитывает
+        self.release()
+        await self.acquire(loop.time() + delay)
+
+    @asynccontextmanager
+    async def slot(self, at: float = None):
+        """Слот на время выполнения аккаунта, начиная не раньше дедлайна at"""
+        await self.acquire(at)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        while self._heap and self._has_free_slot():
+            deadline, _, future = self._heap[0]
+            if future.done():
+                # Ожидающий отменен
+                heapq.heappop(self._heap)
+                continue
+            if deadline > now:
+                break
+            heapq.heappop(self._heap)
+            self.active += 1
+            future.set_result(None)
+
+        # Ближайший дедлайн будит планировщик, если к нему будет свободный слот.
+        # Без свободного слота следующую выдачу сделает release()
+        if not self._heap or not self._has_free_slot():
+            return
+        deadline = self._heap[0][0]
+        if self._timer is not None and self._timer_at <= deadline:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_at = deadline
+        self._timer = loop.call_at(deadline, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._timer_at = math.inf
+        self._dispatch()
@@ -0,0 +1,168 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+
+from general_settings import SIGNER_PROCESSES, SIGNER_BATCH_SIZE, SIGNER_BATCH_WAIT, SIGNER_MIN_BATCH
+from utils.logger import logger
+
+# Ключи внутри процесса-подписанта: адрес -> аккаунт
+_worker_accounts: Dict[str, LocalAccount] = {}
+
+
+def _init_worker(private_keys: List[str]):
+    for private_key in private_keys:
+        account = Account.from_key(private_key)
+        _worker_accounts[account.address] = account
+
+
+def _sign_batch(batch: List[Tuple[str, dict]], accounts: Dict[str, LocalAccount] = None) -> list:
+    """Подписывает пачку в процессе пула: raw транзакция или исключение на каждый элемент"""
+    accounts = _worker_accounts if accounts is None else accounts
+    results = []
+    for address, tx_data in batch:
+        try:
+            results.append(bytes(accounts[address].sign_transaction(tx_data).raw_transaction))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class SigningService:
+    def __init__(
+        self,
+        private_keys: Iterable[str],
+        processes: int = SIGNER_PROCESSES,
+        batch_size: int = SIGNER_BATCH_SIZE,
+        batch_wait: float = SIGNER_BATCH_WAIT,
+        min_batch: int = SIGNER_MIN_BATCH,
+    ):
+        """
+        Подпись транзакций в пуле процессов
+
+        Ключи передаются процессам пула один раз при старте, дальше в пул уходят
+        только адрес и неподписанная транзакция, обратно - raw транзакция.
+        Запросы копятся до batch_size штук или batch_wait секунд и подписываются
+        одной пачкой, чтобы не платить за пересылку между процессами на каждую подпись.
+        Пачка меньше min_batch подписывается в основном процессе: пересылка
+        в пул стоит дороже самой подписи.
+
+        Args:
+            private_keys (Iterable[str]): Ключи аккаунтов, которые будет подписывать пул
+            processes (int): Количество процессов
+            batch_size (int): Максимальный размер пачки
+            batch_wait (float): Сколько ждать наполнения пачки, секунд
+            min_batch (int): С какого размера пачка уходит в пул
+        """
+        private_keys = list(private_keys)
+        self._accounts = {account.address: account for account in map(Account.from_key, private_keys)}
+        self.addresses = set(self._accounts)
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.min_batch = min_batch
+        self._pool = ProcessPoolExecutor(
+            max_workers=max(1, processes), initializer=_init_worker, initargs=(private_keys,)
+        )
+        self._queue: List[Tuple[str, dict, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches = set()
+
+    async def sign(self, address: str, tx_data: dict) -> bytes:
+        """Подписывает транзакцию ключом address и возвращает raw транзакцию"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((address, dict(tx_data), future))
+
+        if len(self._queue) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._queue:
+            return
+
+        batch, self._queue = self._queue, []
+        if len(batch) < self.min_batch:
+            self._settle(batch, _sign_batch([(address, tx_data) for address, tx_data, _ in batch], self._accounts))
+            return
+        task = asyncio.ensure_future(self._sign_batch(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _sign_batch(self, batch: List[Tuple[str, dict, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self._pool, _sign_batch, [(address, tx_data) for address, tx_data, _ in batch]
+            )
+        except Exception as e:
+            # Пул недоступен (например, процесс упал) - ошибка у всей пачки
+            results = [e] * len(batch)
+        self._settle(batch, results)
+
+    @staticmethod
+    def _settle(batch: List[Tuple[str, dict, asyncio.Future]], results: list):
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def shutdown(self):
+        # Не ждем завершения процессов: shutdown вызывается из event loop
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_service: Optional[SigningService] = None
+
+
+def start_signer(private_keys: Iterable[str], processes: int = SIGNER_PROCESSES) -> Optional[SigningService]:
+    """
+    Запускает общий пул подписи (при processes = 0 подпись остается в основном процессе)
+
+    Пулу оставляются ядра, не занятые основным процессом: на одном ядре
+    процессы-подписанты только отнимают время у event loop, и подпись
+    остается в основном процессе.
+    """
+    global _service
+    stop_signer()
+    free_cpus = (os.cpu_count() or 1) - 1
+    if processes > free_cpus:
+        logger.info(
+            f"Signer: Свободных ядер для пула: {max(0, free_cpus)}, процессов подписи: "
+            f"{max(0, free_cpus)} вместо {processes} (0 - подпись в основном процессе)"
+        )
+        processes = max(0, free_cpus)
+    if processes > 0:
+        _service = SigningService(private_keys, processes)
+        logger.info(f"Signer: Пул подписи запущен, процессов: {processes}")
+    return _service
+
+
+def stop_signer():
+    global _service
+    if _service is not None:
+        _service.shutdown()
+        _service = None
+
+
+async def sign_transaction(account: LocalAccount, tx_data: dict) -> bytes:
+    """
+    Подписывает транзакцию и возвращает raw транзакцию
+
+    Если запущен пул подписи и ключ аккаунта в нем есть, подпись идет в пуле,
+    иначе - в текущем процессе, как раньше.
+    """
+    if _service is not None and account.address in _service.addresses:
+        return await _service.sign(account.address, tx_data)
+    return bytes(account.sign_transaction(tx_data).raw_transaction)
@@ -1,6 +1,7 @@
 import sys
 import os
 import asyncio
+import html
 from aiogram import Bot, Dispatcher, types
 from aiogram.filters import Command
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
@@ -9,7 +10,9 @@ from general_settings import API_TOKEN, ADMIN_ID
 # Добавляю путь к корню проекта для корректного импорта process
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from process import Process
-from utils.tools import check_balances
+
+# Лимит Telegram - 4096 символов, часть уходит на заголовок и <pre>
+MESSAGE_PAGE_SIZE = 3900
 
 bot = Bot(token=API_TOKEN)
 dp = Dispatcher()
@@ -23,6 +26,24 @@ main_keyboard = ReplyKeyboardMarkup(
     resize_keyboard=True,
 )
 
+def split_pages(text: str, page_size: int = MESSAGE_PAGE_SIZE) -> list:
+    """Делит текст на страницы по строкам, каждая не длиннее page_size"""
+    pages, page = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > page_size:
+            if page:
+                pages.append(page)
+                page = ""
+            pages.append(line[:page_size])
+            line = line[page_size:]
+        if len(page) + len(line) > page_size:
+            pages.append(page)
+            page = ""
+        page += line
+    if page.strip():
+        pages.append(page)
+    return pages
+
 async def send_menu(message: types.Message):
     menu = (
         "МЕНЮ БОТА\n\n"
@@ -45,8 +66,13 @@ async def cmd_run(message: types.Message):
         await message.answer("Нет доступа.")
         return
     await message.answer("Запуск главного процесса...", reply_markup=main_keyboard)
-    loop = asyncio.get_event_loop()
-    await loop.run_in_executor(None, lambda: Process().start(exit_on_finish=False))
+    try:
+        # Чтение Excel и снимка аккаунтов - синхронный ввод-вывод, выполняем его вне event loop бота
+        process = await asyncio.to_thread(Process)
+        await process.run()
+    except Exception as e:
+        await message.answer(f"Ошибка в главном процессе: {e}", reply_markup=main_keyboard)
+        return
     await message.answer("Главный процесс завершён.", reply_markup=main_keyboard)
 
 @dp.message(Command("balance"))
@@ -55,17 +81,18 @@ async def cmd_balance(message: types.Message):
         await message.answer("Нет доступа.")
         return
     await message.answer("Проверка балансов...", reply_markup=main_keyboard)
-    # Собираем вывод функции проверки баланса
-    from contextlib import redirect_stdout
-    import io
-    buf = io.StringIO()
+    # web3 и pandas загружаются при первой проверке балансов, а не при старте бота
+    from utils.tools import check_balances
+    from src.modulse.balance_checker.balance_checker import format_summary
+
     try:
-        with redirect_stdout(buf):
-            await check_balances()
-        result = buf.getvalue()
-        if not result.strip():
-            result = "Баланс успешно проверен."
-        await message.answer(f"Результат проверки баланса:\n<pre>{result}</pre>", parse_mode="HTML", reply_markup=main_keyboard)
+        results = await check_balances(display=False)
+        if results is None:
+            await message.answer("Нет доступных аккаунтов", reply_markup=main_keyboard)
+            return
+        # Сводка (топ кошельков и итоги) отправляется страницами в пределах лимита сообщения
+        for page in split_pages(format_summary(results)):
+            await message.answer(f"<pre>{html.escape(page)}</pre>", parse_mode="HTML", reply_markup=main_keyboard)
     except Exception as e:
         await message.answer(f"Ошибка при проверке баланса: {e}", reply_markup=main_keyboard)
 
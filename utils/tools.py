@@ -1,8 +1,6 @@
 import random
 import io
-import msoffcrypto
 import asyncio
-import pandas as pd
 import sys
 import os
 
@@ -16,10 +14,15 @@ from general_settings import (
     EXCEL_PASSWORD,
     EXCEL_FILE_PATH,
     EXCEL_PAGE_NAME,
+    ACCOUNTS_SNAPSHOT,
+    BALANCE_EXPORT_FORMAT,
+    BALANCE_EXPORT_PATH,
 )
 
-from eth_account import Account
-from src.modulse.balance_checker.balance_checker import BalanceChecker
+from utils.account_snapshot import load_snapshot, save_snapshot
+
+# pandas, msoffcrypto, eth_account и web3 импортируются внутри функций:
+# при актуальном снимке аккаунтов они не нужны, а их импорт занимает секунды
 
 async def sleep(self, min_time=SLEEP_TIME_MODULES[0], max_time=SLEEP_TIME_MODULES[1]):
     duration = random.randint(min_time, max_time)
@@ -28,103 +31,142 @@ async def sleep(self, min_time=SLEEP_TIME_MODULES[0], max_time=SLEEP_TIME_MODULE
     await asyncio.sleep(duration)
 
 
-def get_accounts_data():
-    try:
-        decrypted_data = io.BytesIO()
-        with open(EXCEL_FILE_PATH, "rb") as file:
-            if EXCEL_PASSWORD:
-                cprint("⚔️ Введите пароль degen", color="light_blue")
-                password = getpass()
-                office_file = msoffcrypto.OfficeFile(file)
-
-                try:
-                    office_file.load_key(password=password)
-                except msoffcrypto.exceptions.DecryptionError:
-                    cprint(
-                        "\n⚠️ Неверный пароль для расшифровки Excel файла! ⚠️",
-                        color="light_red",
-                        attrs=["blink"],
-                    )
-                    raise DecryptionError("Incorrect password")
-
-                try:
-                    office_file.decrypt(decrypted_data)
-                except msoffcrypto.exceptions.InvalidKeyError:
-                    cprint(
-                        "\n⚠️ Неверный пароль для расшифровки Excel файла! ⚠️",
-                        color="light_red",
-                        attrs=["blink"],
-                    )
-                    raise InvalidKeyError("Incorrect password")
-
-                except msoffcrypto.exceptions.DecryptionError:
-                    cprint(
-                        "\n⚠️ Сначала установите пароль на ваш Excel файл! ⚠️",
-                        color="light_red",
-                        attrs=["blink"],
-                    )
-                    raise DecryptionError("Excel without password")
+# Данные аккаунтов, уже прочитанные в этом процессе: (путь, mtime, размер) -> данные
+_accounts_memo = {}
+_excel_password = None
 
-                office_file.decrypt(decrypted_data)
 
-                try:
-                    wb = pd.read_excel(decrypted_data, sheet_name=EXCEL_PAGE_NAME)
-                except ValueError as error:
-                    cprint("\n⚠️ Неверное имя страницы! ⚠️", color="light_red", attrs=["blink"])
-                    raise ValueError(f"{error}")
-            else:
-                try:
-                    wb = pd.read_excel(file, sheet_name=EXCEL_PAGE_NAME)
-                except ValueError as error:
-                    cprint("\n⚠️ Неверное имя страницы! ⚠️", color="light_red", attrs=["blink"])
-                    raise ValueError(f"{error}")
-
-            accounts_data = {}
-            for index, row in wb.iterrows():
-                account_name = row["Name"]
-                private_key = row["Private Key"]
-                proxy = row["Proxy"]
-                email_address = row["Email Address"]
-                email_password = row["Email Password"]
-
-                accounts_data[int(index) + 1] = {
-                    "account_number": account_name,
-                    "private_key": private_key,
-                    "proxy": proxy,
-                    "email_address": email_address,
-                    "email_password": email_password,
-                }
-
-            acc_names, private_keys, proxies, email_addresses, email_passwords = (
-                [],
-                [],
-                [],
-                [],
-                [],
-            )
-            for k, v in accounts_data.items():
-                acc_names.append(
-                    v["account_number"]
-                    if isinstance(v["account_number"], (int, str))
-                    else None
+def get_excel_password():
+    """Запрашивает пароль Excel файла один раз за запуск"""
+    global _excel_password
+    if EXCEL_PASSWORD and _excel_password is None:
+        cprint("⚔️ Введите пароль degen", color="light_blue")
+        _excel_password = getpass()
+    return _excel_password
+
+
+def read_accounts_excel(password):
+    """Расшифровывает и разбирает Excel файл с аккаунтами"""
+    import msoffcrypto
+    import pandas as pd
+    from eth_account import Account
+
+    decrypted_data = io.BytesIO()
+    with open(EXCEL_FILE_PATH, "rb") as file:
+        if password:
+            office_file = msoffcrypto.OfficeFile(file)
+
+            try:
+                office_file.load_key(password=password)
+            except msoffcrypto.exceptions.DecryptionError:
+                cprint(
+                    "\n⚠️ Неверный пароль для расшифровки Excel файла! ⚠️",
+                    color="light_red",
+                    attrs=["blink"],
                 )
-                private_keys.append(v["private_key"])
-                proxies.append(v["proxy"] if isinstance(v["proxy"], str) else None)
-                email_addresses.append(
-                    v["email_address"] if isinstance(v["email_address"], str) else None
+                raise DecryptionError("Incorrect password")
+
+            try:
+                office_file.decrypt(decrypted_data)
+            except msoffcrypto.exceptions.InvalidKeyError:
+                cprint(
+                    "\n⚠️ Неверный пароль для расшифровки Excel файла! ⚠️",
+                    color="light_red",
+                    attrs=["blink"],
                 )
-                email_passwords.append(
-                    v["email_password"]
-                    if isinstance(v["email_password"], str)
-                    else None
+                raise InvalidKeyError("Incorrect password")
+
+            except msoffcrypto.exceptions.DecryptionError:
+                cprint(
+                    "\n⚠️ Сначала установите пароль на ваш Excel файл! ⚠️",
+                    color="light_red",
+                    attrs=["blink"],
                 )
+                raise DecryptionError("Excel without password")
+
+            try:
+                wb = pd.read_excel(decrypted_data, sheet_name=EXCEL_PAGE_NAME)
+            except ValueError as error:
+                cprint("\n⚠️ Неверное имя страницы! ⚠️", color="light_red", attrs=["blink"])
+                raise ValueError(f"{error}")
+        else:
+            try:
+                wb = pd.read_excel(file, sheet_name=EXCEL_PAGE_NAME)
+            except ValueError as error:
+                cprint("\n⚠️ Неверное имя страницы! ⚠️", color="light_red", attrs=["blink"])
+                raise ValueError(f"{error}")
+
+    # Колонки целиком вместо iterrows(): tolist() сразу дает обычные типы Python
+    acc_names = [
+        str(item) for item in wb["Name"].tolist() if isinstance(item, (int, str))
+    ]
+    private_keys = wb["Private Key"].tolist()
+    proxies = [item for item in wb["Proxy"].tolist() if isinstance(item, str)]
+    email_addresses = [
+        item for item in wb["Email Address"].tolist() if isinstance(item, str)
+    ]
+    email_passwords = [
+        item for item in wb["Email Password"].tolist() if isinstance(item, str)
+    ]
+
+    # Адреса считаются один раз и сохраняются в снимке вместе с ключами
+    addresses = []
+    for private_key in private_keys:
+        try:
+            addresses.append(Account.from_key(private_key).address)
+        except Exception:
+            addresses.append(None)
+
+    return {
+        "acc_names": acc_names,
+        "private_keys": private_keys,
+        "proxies": proxies,
+        "email_addresses": email_addresses,
+        "email_passwords": email_passwords,
+        "addresses": addresses,
+    }
+
+
+def load_accounts():
+    """
+    Данные аккаунтов: из памяти, из снимка или из Excel файла
+
+    Excel файл расшифровывается и разбирается только если он изменился
+    с момента последнего снимка (см. utils/account_snapshot.py). Снимок
+    хранится только зашифрованным, без EXCEL_PASSWORD Excel разбирается заново.
+    """
+    stat = os.stat(EXCEL_FILE_PATH)
+    memo_key = (EXCEL_FILE_PATH, stat.st_mtime_ns, stat.st_size)
+    if memo_key in _accounts_memo:
+        return _accounts_memo[memo_key]
+
+    password = get_excel_password()
+
+    use_snapshot = ACCOUNTS_SNAPSHOT and bool(password)
+    data = load_snapshot(EXCEL_FILE_PATH, password) if use_snapshot else None
+    if data is None:
+        data = read_accounts_excel(password)
+        if use_snapshot:
+            try:
+                save_snapshot(EXCEL_FILE_PATH, password, data)
+            except OSError as error:
+                cprint(f"\nНе удалось сохранить снимок аккаунтов: {error}", color="light_yellow")
+
+    _accounts_memo.clear()
+    _accounts_memo[memo_key] = data
+    return data
 
-            acc_names = [str(item) for item in acc_names if item is not None]
-            proxies = [item for item in proxies if item is not None]
-            email_addresses = [item for item in email_addresses if item is not None]
-            email_passwords = [item for item in email_passwords if item is not None]
 
-            return acc_names, private_keys, proxies, email_addresses, email_passwords
+def get_accounts_data():
+    try:
+        data = load_accounts()
+        return (
+            data["acc_names"],
+            data["private_keys"],
+            data["proxies"],
+            data["email_addresses"],
+            data["email_passwords"],
+        )
     except (DecryptionError, InvalidKeyError, DecryptionError, ValueError):
         sys.exit()
 
@@ -142,8 +184,25 @@ def get_accounts_data():
         )
         sys.exit()
 
-async def check_balances():
-    """Функция для проверки балансов"""
+
+def get_account_addresses():
+    """Адреса кошельков из приватных ключей (берутся из снимка, без повторного вывода)"""
+    return [address for address in load_accounts()["addresses"] if address]
+
+async def check_balances(display: bool = True):
+    """
+    Функция для проверки балансов
+
+    Args:
+        display (bool): Вывести сводку в консоль
+
+    Returns:
+        BalanceTable: Матрица балансов (None, если аккаунтов нет)
+    """
+    from src.modulse.balance_checker.balance_checker import BalanceChecker
+    from src.modulse.balance_checker.sinks import make_sink
+    from utils.rpc import rpc_sessions
+
     print("\nПроверка балансов кошельков")
     
     # Получаем данные всех аккаунтов
@@ -152,15 +211,21 @@ async def check_balances():
         print("Нет доступных аккаунтов")
         return
     
-    # Получаем адреса кошельков из приватных ключей
-    wallets = []
-    for private_key in accounts_data[1]:  # Берем список приватных ключей
-        account = Account.from_key(private_key)
-        wallets.append(account.address)
+    # Адреса кошельков уже выведены из приватных ключей при загрузке аккаунтов
+    wallets = get_account_addresses()
     
     # Используем первый аккаунт для проверки балансов
     private_key = accounts_data[1][0]  # Первый приватный ключ
     proxy = accounts_data[2][0]  # Первый прокси
     
     checker = BalanceChecker(private_key, proxy)
-    await checker.run(wallets)
+    # Полный список балансов выгружается в файл, в консоль выводится сводка
+    sink = make_sink(BALANCE_EXPORT_FORMAT, BALANCE_EXPORT_PATH)
+    sinks = [sink] if sink else []
+    # Сессии общие с запуском /run в боте - закрываются, только если он уже завершен
+    async with rpc_sessions():
+        results = await checker.run(wallets, sinks, display=display)
+
+    if sink:
+        print(f"Балансы всех кошельков сохранены в {sink.path}")
+    return results
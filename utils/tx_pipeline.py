@@ -0,0 +1,87 @@
+import asyncio
+from typing import Awaitable, Callable, Optional, Set, TypeVar
+
+from hexbytes import HexBytes
+
+from general_settings import MAX_TX_IN_FLIGHT
+from utils.journal import FAILED, TX_CONFIRMED, TX_SENT
+
+T = TypeVar("T")
+
+
+class TxPipeline:
+    def __init__(self, max_in_flight: int = MAX_TX_IN_FLIGHT):
+        """
+        Конвейер отправки транзакций одного аккаунта
+
+        Транзакция отправляется сразу, а ожидание ее подтверждения идет в фоне.
+        Одновременно в полете не больше max_in_flight неподтвержденных транзакций.
+
+        Args:
+            max_in_flight (int): Лимит неподтвержденных транзакций
+        """
+        self._slots = asyncio.Semaphore(max(1, max_in_flight))
+        self._pending: Set[asyncio.Task] = set()
+        # Запись состояний транзакций в журнал запуска: (хеш, состояние), см. utils/journal.py
+        self.journal: Optional[Callable[[str, str], None]] = None
+
+    async def submit(
+        self,
+        send: Callable[[], Awaitable[HexBytes]],
+        confirm: Callable[[HexBytes], Awaitable[T]],
+    ) -> "asyncio.Task[T]":
+        """
+        Отправляет транзакцию и возвращает задачу ожидания ее подтверждения
+
+        Args:
+            send: Подписывает и отправляет транзакцию, возвращает ее хеш
+            confirm: Ждет подтверждения по хешу и возвращает результат задачи
+        """
+        await self._slots.acquire()
+        try:
+            tx_hash = await send()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        # Подтверждение пишется в журнал того задания, из которого транзакция отправлена
+        journal = self.journal
+        if journal is not None:
+            journal(HexBytes(tx_hash).to_0x_hex(), TX_SENT)
+
+        task = asyncio.ensure_future(self._confirm(confirm, tx_hash, journal))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+
+    async def _confirm(
+        self,
+        confirm: Callable[[HexBytes], Awaitable[T]],
+        tx_hash: HexBytes,
+        journal: Optional[Callable[[str, str], None]] = None,
+    ) -> T:
+        try:
+            result = await confirm(tx_hash)
+            if journal is not None:
+                journal(HexBytes(tx_hash).to_0x_hex(), TX_CONFIRMED if result else FAILED)
+            return result
+        finally:
+            self._slots.release()
+
+    async def drain(self):
+        """Дожидается подтверждения всех отправленных транзакций"""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+
+async def confirm_all(*pending) -> list:
+    """
+    Дожидается результатов execute_transaction(wait=False)
+
+    Задачи ожидаются параллельно и заменяются своими результатами,
+    остальные значения (хеш или None) возвращаются как есть.
+    """
+    futures = [item for item in pending if isinstance(item, asyncio.Future)]
+    if futures:
+        await asyncio.gather(*futures)
+    return [item.result() if isinstance(item, asyncio.Future) else item for item in pending]